@@ -1,96 +1,263 @@
 import os
-import ssl
-import smtplib
-from email.message import EmailMessage
-from datetime import datetime
+import threading
+import numpy as np
 import streamlit as st
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from utils import alert_store
+from utils.alert_logic import AlertSystem, build_alert_frame, priority_keys
+from utils.alert_rules import active_rules
+from utils.dataset import dataset_version, load_enriched_dataset, student_positions
+from utils.mailer import SECURITY_MODES, SENT, SmtpSettings, get_mail_queue
+from utils.ranking import top_k
 
 
+# Notifications and interventions are stored in data/alerts.db (utils.alert_store),
+# shared by every session; only per-session UI state is kept in st.session_state.
+
 def _ensure_alerts_state() -> None:
-    if 'notifications' not in st.session_state:
-        st.session_state['notifications'] = {}
+    alert_store.init_db()
     if 'alert_acknowledged' not in st.session_state:
         st.session_state['alert_acknowledged'] = set()
-    if 'interventions' not in st.session_state:
-        st.session_state['interventions'] = {}
+
+
+def _note(row: Dict) -> Dict:
+    return {
+        'id': row['id'],
+        'subject': row['subject'],
+        'message': row['message'],
+        'advisor': row['advisor'],
+        'date': row['created_at'],
+        'acknowledged': row['status'] == alert_store.ACKNOWLEDGED,
+    }
 
 
 def add_alert(student_id: str, subject: str, message: str, advisor: str = 'Advisor') -> Dict:
     _ensure_alerts_state()
-    note = {
-        'subject': subject,
-        'message': message,
-        'advisor': advisor,
-        'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'acknowledged': False,
-    }
-    st.session_state['notifications'].setdefault(student_id, []).append(note)
-    return note
+    alert_store.add_notifications([(student_id, subject, message)], advisor=advisor)
+    notes = get_alerts_for_student(student_id)
+    return notes[-1] if notes else {}
+
+
+def add_alerts(entries: List[Tuple[str, str, str]], advisor: str = 'Advisor',
+               dedup_keys: Optional[Iterable[str]] = None, severities: Optional[Iterable[str]] = None) -> int:
+    """Record many (student_id, subject, message) notifications in one write.
+
+    Entries whose dedup key was recorded before are skipped; returns the number added.
+    """
+    _ensure_alerts_state()
+    return alert_store.add_notifications(entries, advisor=advisor, dedup_keys=dedup_keys, severities=severities)
+
+
+class AlertFeed:
+    """Rule-engine alerts of one dataset/rules version: advisor cards plus the notifications they raise.
+
+    Built once per process and version (alert_feed); pages read it without
+    re-evaluating anything, and enqueue_new writes each entry at most once.
+    """
+
+    def __init__(self, students: List[Dict]):
+        self.students = students
+        # row of each student in the enriched frame, so pages can test row masks without id sets
+        self.positions: np.ndarray = student_positions(s.get('student_id') for s in students)
+        self.entries: List[Tuple[str, str, str]] = []
+        self.keys: List[str] = []
+        self.severities: List[str] = []
+        for student in students:
+            sid = student.get('student_id')
+            for alert in student.get('alerts', []):
+                message = alert.get('message', '')
+                self.entries.append((sid, f"{alert.get('type')} - {alert.get('severity', '').upper()}", message))
+                self.keys.append("|".join(str(part) for part in (sid, alert.get('type'), alert.get('severity'), message)))
+                self.severities.append(alert.get('severity'))
+        alerts = [student.get('alerts', []) for student in students]
+        self.priority: np.ndarray = priority_keys(
+            [sum(a.get('severity') == 'critical' for a in student_alerts) for student_alerts in alerts],
+            [len(student_alerts) for student_alerts in alerts],
+        )
+        self._enqueued = 0
+        self._lock = threading.Lock()
+
+    def top(self, k: int) -> List[Dict]:
+        """The k most urgent students (most critical, then most alerts); ties keep feed order."""
+        return [self.students[i] for i in top_k(self.priority, k).tolist()]
+
+    def selected(self, mask: np.ndarray) -> np.ndarray:
+        """Per feed student, whether the boolean enriched-frame row mask selects their row."""
+        known = self.positions >= 0
+        hits = np.zeros(len(self.positions), dtype=bool)
+        hits[known] = mask[self.positions[known]]
+        return hits
+
+    def enqueue_new(self, advisor: str = 'Advisor') -> int:
+        """Record entries this process has not written yet; O(1) once the feed is drained.
+
+        The store skips keys any session or process recorded before. Returns the number added.
+        """
+        with self._lock:
+            if self._enqueued == len(self.entries):
+                return 0
+            added = add_alerts(self.entries[self._enqueued:], advisor=advisor,
+                               dedup_keys=self.keys[self._enqueued:], severities=self.severities[self._enqueued:])
+            self._enqueued = len(self.entries)
+            return added
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _alert_feed(version: str, rules_version: str) -> AlertFeed:
+    students, _ = AlertSystem.get_students_with_alerts(build_alert_frame(load_enriched_dataset()))
+    return AlertFeed(students)
+
+
+def alert_feed() -> AlertFeed:
+    """Alert feed for the current dataset and alert rules (rebuilt when either changes)."""
+    return _alert_feed(dataset_version(), active_rules(AlertSystem).version)
 
 
 def get_alerts_for_student(student_id: str) -> List[Dict]:
+    """Open notifications for a student, oldest first."""
     _ensure_alerts_state()
-    return st.session_state['notifications'].get(student_id, [])
+    return [_note(row) for row in alert_store.notifications_for_student(student_id)]
+
+
+def has_notifications() -> bool:
+    return alert_store.count_notifications() > 0
+
+
+def notification_filters(student_ids: Optional[Set[str]], subject_contains: str, severity: str) -> Dict:
+    """Keyword filters for count/list_notifications from the alerts page controls."""
+    return {
+        'student_ids': student_ids,
+        'subject_contains': subject_contains or None,
+        'critical': None if severity == 'All' else severity == 'Critical',
+    }
+
+
+def count_notification_page(filters: Dict) -> int:
+    return alert_store.count_notifications(**filters)
+
+
+def get_notification_page(filters: Dict, limit: int, offset: int) -> List[Dict]:
+    """One page of open notifications, each with its 'student_id' and 'severity'."""
+    notes = []
+    for row in alert_store.list_notifications(limit=limit, offset=offset, **filters):
+        note = _note(row)
+        note['student_id'] = row['student_id']
+        note['severity'] = row['severity']
+        notes.append(note)
+    return notes
+
+
+def acknowledge_notification(notification_id: int, acknowledged_by: str = 'Advisor') -> bool:
+    try:
+        return alert_store.acknowledge_notification(notification_id, acknowledged_by)
+    except Exception:
+        return False
 
 
 def acknowledge_alert(student_id: str, index: int) -> bool:
+    """Acknowledge the index-th open notification of a student."""
     _ensure_alerts_state()
     try:
-        notes = st.session_state['notifications'].get(student_id, [])
+        notes = get_alerts_for_student(student_id)
         if index < 0 or index >= len(notes):
             return False
-        note = notes.pop(index)
-        st.session_state['alert_acknowledged'].add(student_id)
-        intervention = {
-            'type': 'Notification Acknowledged',
-            'advisor': note.get('advisor', 'Advisor'),
-            'notes': note.get('message', ''),
-            'date': datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
-        st.session_state['interventions'].setdefault(student_id, []).append(intervention)
-        return True
+        ok = acknowledge_notification(notes[index]['id'])
+        if ok:
+            st.session_state['alert_acknowledged'].add(student_id)
+        return ok
     except Exception:
         return False
 
 
-def is_email_configured() -> bool:
-    return all([
-        st.session_state.get('SMTP_HOST') or os.environ.get('SMTP_HOST'),
-        st.session_state.get('SMTP_PORT') or os.environ.get('SMTP_PORT'),
-        st.session_state.get('SMTP_USER') or os.environ.get('SMTP_USER'),
-        st.session_state.get('SMTP_PASSWORD') or os.environ.get('SMTP_PASSWORD'),
-        st.session_state.get('EMAIL_FROM') or os.environ.get('EMAIL_FROM'),
-    ])
+def add_intervention(student_id: str, intervention_type: str, advisor: str, notes: str) -> int:
+    _ensure_alerts_state()
+    return alert_store.add_intervention(student_id, intervention_type, advisor, notes)
 
 
-def send_email(to_address: str, subject: str, body: str) -> Tuple[bool, str]:
-    smtp_host = st.session_state.get('SMTP_HOST') or os.environ.get('SMTP_HOST')
-    smtp_port = st.session_state.get('SMTP_PORT') or os.environ.get('SMTP_PORT')
-    smtp_user = st.session_state.get('SMTP_USER') or os.environ.get('SMTP_USER')
-    smtp_pass = st.session_state.get('SMTP_PASSWORD') or os.environ.get('SMTP_PASSWORD')
-    email_from = st.session_state.get('EMAIL_FROM') or os.environ.get('EMAIL_FROM')
+def get_interventions(student_id: str, limit: int = 50, offset: int = 0) -> List[Dict]:
+    """A page of a student's interventions, newest first, as {'type', 'advisor', 'notes', 'date'}."""
+    _ensure_alerts_state()
+    return [
+        {
+            'type': row['alert_type'],
+            'advisor': row['assigned_to'],
+            'notes': row['notes'],
+            'date': (row['created_at'] or '')[:16],
+        }
+        for row in alert_store.list_interventions(student_id, limit=limit, offset=offset)
+    ]
+
+
+def _setting(name: str) -> Optional[str]:
+    return st.session_state.get(name) or os.environ.get(name)
 
-    if not (smtp_host and smtp_port and smtp_user and smtp_pass and email_from):
-        return False, "SMTP not configured. Set SMTP credentials to enable email sending."
 
+def _smtp_settings() -> Tuple[Optional[SmtpSettings], str]:
+    """SMTP settings from session state or environment, or (None, reason)."""
+    smtp_host = _setting('SMTP_HOST')
+    smtp_port = _setting('SMTP_PORT')
+    smtp_user = _setting('SMTP_USER') or ''
+    smtp_pass = _setting('SMTP_PASSWORD') or ''
+    email_from = _setting('EMAIL_FROM')
+    security = (_setting('SMTP_SECURITY') or 'ssl').lower()
+
+    if not is_email_configured():
+        return None, "SMTP not configured. Set SMTP credentials to enable email sending."
+    if security not in SECURITY_MODES:
+        return None, "Invalid SMTP_SECURITY"
     try:
         port = int(smtp_port)
     except Exception:
-        return False, "Invalid SMTP_PORT"
+        return None, "Invalid SMTP_PORT"
+    return SmtpSettings(smtp_host, port, email_from, smtp_user, smtp_pass, security), ''
+
+
+def is_email_configured() -> bool:
+    # credentials are optional only for plain, unauthenticated relays (SMTP_SECURITY=none)
+    needs_login = (_setting('SMTP_SECURITY') or 'ssl').lower() != 'none'
+    return all([
+        _setting('SMTP_HOST'),
+        _setting('SMTP_PORT'),
+        _setting('SMTP_USER') or not needs_login,
+        _setting('SMTP_PASSWORD') or not needs_login,
+        _setting('EMAIL_FROM'),
+    ])
 
-    try:
-        msg = EmailMessage()
-        msg['Subject'] = subject
-        msg['From'] = email_from
-        msg['To'] = to_address
-        msg.set_content(body)
 
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL(smtp_host, port, context=context) as server:
-            server.login(smtp_user, smtp_pass)
-            server.send_message(msg)
+def queue_emails(messages: List[Tuple[str, str, str]]) -> Tuple[List[int], str]:
+    """Hand (to, subject, body) messages to the background mailer; returns (job ids, info)."""
+    settings, reason = _smtp_settings()
+    if settings is None:
+        return [], reason
+    job_ids = get_mail_queue(settings).submit_many(messages)
+    return job_ids, f'{len(job_ids)} email(s) queued'
+
+
+def queue_email(to_address: str, subject: str, body: str) -> Tuple[Optional[int], str]:
+    """Queue one email without waiting for the SMTP server; returns (job id, info)."""
+    job_ids, info = queue_emails([(to_address, subject, body)])
+    return (job_ids[0] if job_ids else None), info
+
+
+def email_status(job_ids: List[int]) -> Dict[str, int]:
+    """Delivery counts per status ('queued', 'sending', 'sent', 'failed') for queued jobs."""
+    settings, _ = _smtp_settings()
+    if settings is None or not job_ids:
+        return {}
+    return get_mail_queue(settings).summary(job_ids)
+
+
+def send_email(to_address: str, subject: str, body: str) -> Tuple[bool, str]:
+    """Send one email and wait for the result (delivered over the pooled connection)."""
+    settings, reason = _smtp_settings()
+    if settings is None:
+        return False, reason
 
+    mail_queue = get_mail_queue(settings)
+    job_id = mail_queue.submit(to_address, subject, body)
+    if not mail_queue.wait([job_id], timeout=settings.timeout):
+        return False, 'Email queued; the SMTP server has not answered yet'
+    job = mail_queue.status(job_id)
+    if job is not None and job.status == SENT:
         return True, 'Email sent'
-    except Exception as e:
-        return False, f'Email error: {e}'
+    return False, job.error if job is not None else 'Email error: unknown job'
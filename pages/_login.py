@@ -1,5 +1,7 @@
 import streamlit as st
 
+from pages._theme import stylesheet
+
 _USERS = {
     "advisor1": "password123",
     "admin": "adminpass",
@@ -7,44 +9,7 @@ _USERS = {
 
 
 def render(navigate_to):
-    st.markdown(
-        """
-        <style>
-          :root {
-            --hsu-primary: #2563EB;
-            --hsu-muted: #64748B;
-          }
-          .login-title-text {
-            text-align: center;
-            color: var(--hsu-primary);
-            font-size: 24px;
-            font-weight: 700;
-            margin-bottom: 4px;
-          }
-          .login-subtitle-text {
-            text-align: center;
-            text-transform: uppercase;
-            letter-spacing: 0.4px;
-            font-size: 12px;
-            color: var(--hsu-muted);
-            margin-bottom: 18px;
-          }
-          .login-footer {
-            color: #94A3B8;
-            font-size: 12px;
-            text-align: center;
-            margin-top: 16px;
-          }
-          .login-error {
-            color: #DC2626;
-            font-size: 13px;
-            text-align: center;
-            margin-bottom: 10px;
-          }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    stylesheet("login")
 
     if "login_error" not in st.session_state:
         st.session_state.login_error = None
@@ -1,21 +1,18 @@
 import streamlit as st
 import pandas as pd
 from pages import student_detail
-from pages.advisor_dashboard import load_data
+from utils.dataset import dataset_version, load_dataset
 
 
-def render(navigate_to):
-    st.markdown("""
-    <div class='header-container'>
-        <div class='header-title'>👤 Profile</div>
-        <div class='header-subtitle'>View a student profile</div>
-    </div>
-    """, unsafe_allow_html=True)
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _profile_options(version):
+    """Selectbox labels ("<id> - <name>") and label -> student_id, built once per dataset version.
 
-    df = load_data()
+    (None, None) when the dataset has no student_id column.
+    """
+    df = load_dataset()
     if 'student_id' not in df.columns:
-        st.error("Student data is missing required identifiers.")
-        return
+        return None, None
 
     id_series = df['student_id'].astype(str)
     if 'name' in df.columns:
@@ -26,13 +23,27 @@ def render(navigate_to):
         name_series = id_series
 
     display_options = [f"{sid} - {name}" for sid, name in zip(id_series, name_series)]
-    mapping = dict(zip(display_options, id_series))
+    return ["Choose..."] + display_options, dict(zip(display_options, id_series))
+
+
+def render(navigate_to):
+    st.markdown("""
+    <div class='header-container'>
+        <div class='header-title'>👤 Profile</div>
+        <div class='header-subtitle'>View a student profile</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    display_options, mapping = _profile_options(dataset_version())
+    if display_options is None:
+        st.error("Student data is missing required identifiers.")
+        return
 
     if not mapping:
         st.info("No students available to display.")
         return
 
-    choice = st.selectbox("Select student to view profile", options=["Choose..."] + display_options)
+    choice = st.selectbox("Select student to view profile", options=display_options)
     if choice and choice != "Choose...":
         sid = mapping[choice]
         navigate_to('student-detail', sid)
@@ -0,0 +1,42 @@
+import json
+import os
+from functools import lru_cache
+
+import streamlit as st
+
+# Stylesheets live in static/ next to app.py and are served by Streamlit at app/static/
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STATIC_URL = "app/static"
+
+
+@lru_cache(maxsize=None)
+def _head_style_script(name):
+    """Script that adds static/<name>.css to the document head unless it is already there."""
+    with open(os.path.join(STATIC_DIR, f"{name}.css"), "r", encoding="utf-8") as fh:
+        css = json.dumps(fh.read()).replace("</", "<\\/")
+    element_id = json.dumps(f"stylesheet-{name}")
+    return (
+        "<script>(function () {"
+        f"if (document.getElementById({element_id})) return;"
+        "var style = document.createElement('style');"
+        f"style.id = {element_id}; style.textContent = {css};"
+        "document.head.appendChild(style);"
+        "})();</script>"
+    )
+
+
+def stylesheet(name):
+    """Apply static/<name>.css.
+
+    With server.enableStaticServing (on in .streamlit/config.toml) a rerun only
+    carries a <link> tag and the browser fetches (and caches) the file once.
+    Otherwise the CSS is added to the document head once per session: the
+    <style> element outlives reruns, so later runs send nothing.
+    """
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<link rel="stylesheet" href="{STATIC_URL}/{name}.css">', unsafe_allow_html=True)
+        return
+    applied = st.session_state.setdefault("_stylesheets_applied", set())
+    if name not in applied:
+        st.html(_head_style_script(name), unsafe_allow_javascript=True)
+        applied.add(name)
@@ -1,96 +1,11 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 from datetime import datetime, timedelta
-from typing import Any
-from pages._alerts_lib import _ensure_alerts_state, add_alert, send_email, acknowledge_alert
-from utils.alert_logic import AlertSystem
-
-def _normalize_dataset(df: pd.DataFrame) -> pd.DataFrame:
-    """Ensure key columns exist even if source CSV uses alternate names."""
-    df = df.copy()
-    if 'gpa' not in df.columns:
-        if 'prior_gpa' in df.columns:
-            df['gpa'] = df['prior_gpa']
-        else:
-            df['gpa'] = None
-    if 'credits' not in df.columns:
-        if 'credits_completed' in df.columns:
-            df['credits'] = df['credits_completed']
-        else:
-            df['credits'] = 0
-    return df
-
-
-@st.cache_data
-def load_data():
-    """Load student data from CSV or return mock data"""
-    try:
-        df = pd.read_csv("./data/student_performance_dataset.csv")
-        if len(df) == 0:
-            raise ValueError("CSV is empty")
-        return _normalize_dataset(df)
-    except Exception:
-        # Mock data fallback
-        return pd.DataFrame({
-            'student_id': ['S001', 'S002', 'S003', 'S004', 'S005', 'S006', 'S007', 'S008'],
-            'name': ['John Smith', 'Emily Davis', 'Michael Chen', 'Sarah Johnson', 'David Martinez', 'Jessica Williams', 'Alex Brown', 'Lisa Anderson'],
-            'major': ['Engineering', 'Business', 'Computer Science', 'Arts', 'Engineering', 'Business', 'Computer Science', 'Arts'],
-            'gpa': [2.1, 2.4, 2.8, 3.0, 3.2, 3.5, 2.9, 3.1],
-            'year': ['Junior', 'Sophomore', 'Senior', 'Junior', 'Senior', 'Junior', 'Sophomore', 'Senior'],
-            'credits': [78, 65, 110, 95, 120, 88, 72, 105],
-        })
-
-
-@st.cache_data
-def _prepare_student_dataset(df: pd.DataFrame) -> pd.DataFrame:
-    """Return dataframe with synthesized attributes and risk flags, cached for speed."""
-    df = df.copy()
-    augmented = []
-    for _, row in df.iterrows():
-        profile = synthesize_student_profile(row)
-        score, label = compute_weighted_risk(profile, row.get('gpa', None))
-        flags = compute_indicator_flags(profile, row.get('gpa', None))
-        profile.update({
-            'risk_score': score,
-            'risk_label': label,
-            'risk_flags': str(flags)
-        })
-        augmented.append(profile)
-    profile_df = pd.DataFrame(augmented, index=df.index)
-    return pd.concat([df.reset_index(drop=True), profile_df.reset_index(drop=True)], axis=1)
-
-
-def _series_with_default(df: pd.DataFrame, column: str, default: Any) -> pd.Series:
-    """Return df[column] if present, otherwise a Series filled with default."""
-    if column in df.columns:
-        return df[column]
-    return pd.Series([default] * len(df), index=df.index)
-
-
-def _build_alert_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalize dataframe columns so AlertSystem always gets the expected schema."""
-    if 'student_id' not in df.columns:
-        raise ValueError("student_id column required for alert generation")
-
-    sid = df['student_id']
-    names = _series_with_default(df, 'name', '').astype(str).str.strip()
-    names = names.where(names != "", sid)
-
-    return pd.DataFrame({
-        'student_id': sid,
-        'name': names,
-        'advisor': pd.Series(['Advisor'] * len(df), index=df.index),
-        'gpa': _series_with_default(df, 'gpa', None),
-        'credits': _series_with_default(df, 'credits', 0),
-        'warnings': _series_with_default(df, 'warnings_count', 0),
-        'unpaid_fees': _series_with_default(df, 'unpaid_fees', 0),
-        'financial_aid_status': _series_with_default(df, 'financial_aid_status', 'On time'),
-        'attendance': _series_with_default(df, 'attendance_pct', 90),
-        'counseling_visits': _series_with_default(df, 'counseling_visits', 0),
-        'engagement_score': _series_with_default(df, 'engagement_score', 60),
-    }, index=df.index)
-
+from pages._alerts_lib import _ensure_alerts_state, add_alert, add_alerts, alert_feed, email_status, queue_email, queue_emails, acknowledge_alert
+from utils.dataset import load_enriched_dataset, student_search_index, top_risk_positions
+from utils.pagination import paginate
 
 def _safe_float(value, default=None):
     """Best-effort float conversion that never raises."""
@@ -115,122 +30,51 @@ def _safe_int(value, default=0):
     except (TypeError, ValueError):
         return default
 
-def _seed_from_id(student_id: str) -> int:
-    """Deterministic seed derived from student_id (stable across runs)."""
-    return sum(ord(c) for c in str(student_id))
-
-
-def synthesize_student_profile(row: pd.Series) -> dict:
-    """Create synthetic attributes for a student row based on existing fields.
-
-    Returns a dict with attendance_pct, unpaid_fees, counseling_visits,
-    warnings_count, financial_aid_status, engagement_score, gpa_drop,
-    housing, study_hours.
-    """
-    sid = row.get('student_id', '')
-    gpa = row.get('gpa', None)
-    credits = row.get('credits', 0)
-
-    seed = _seed_from_id(sid)
-
-    # Attendance: base around 75, influenced by GPA and seed
-    base_att = 75
-    if gpa is not None and not pd.isna(gpa):
-        base_att += int((gpa - 2.5) * 8)
-    attendance = int(max(30, min(100, base_att + (seed % 11) - 5)))
-
-    # Unpaid fees synthetic (0..1500)
-    unpaid_fees = (seed % 6) * 300  # 0,300,600,...1500
-
-    # Counseling visits 0..4
-    counseling = seed % 5
-
-    # Warnings count 0..3, slightly higher if low GPA
-    warnings = (seed % 4) + (1 if (gpa is not None and gpa < 2.5) else 0)
-
-    # Financial aid status
-    aid_options = ['On time', 'Delayed', 'Payment Plan']
-    financial_aid = aid_options[seed % len(aid_options)]
-
-    # Engagement score 0..100 influenced by GPA
-    eng = 60
-    if gpa is not None and not pd.isna(gpa):
-        eng += int((gpa - 2.5) * 12)
-    engagement = int(max(0, min(100, eng + (seed % 21) - 10)))
-
-    # GPA drop synthetic 0.0 .. 0.8
-    gpa_drop = round((seed % 9) / 10.0, 2)
-
-    # Housing
-    housing = 'Commuter' if (seed % 2 == 0) else 'On-campus'
-
-    # Study hours per week
-    study_hours = int(max(0, min(80, 15 + int((gpa or 2.5) * 6) + (seed % 21) - 10)))
-
-    return {
-        'attendance_pct': attendance,
-        'unpaid_fees': unpaid_fees,
-        'counseling_visits': counseling,
-        'warnings_count': warnings,
-        'financial_aid_status': financial_aid,
-        'engagement_score': engagement,
-        'gpa_drop': gpa_drop,
-        'housing': housing,
-        'study_hours': study_hours,
-        'credits': credits,
-    }
-
-
-def compute_indicator_flags(profile: dict, gpa: float) -> dict:
-    """Compute boolean flags for each rule from the synthetic profile and GPA."""
-    flags = {}
-    flags['academic_high_risk'] = (gpa is not None and gpa < 2.0)
-    flags['attendance_alert'] = profile['attendance_pct'] < 80
-    flags['financial_risk'] = profile['unpaid_fees'] > 500
-    flags['dropout_risk'] = profile['credits'] < 30
-    flags['low_engagement'] = (profile['counseling_visits'] == 0) or (profile['engagement_score'] < 50)
-    flags['high_attrition_warnings'] = profile['warnings_count'] >= 2
-    flags['stop_out_risk'] = profile['financial_aid_status'] == 'Delayed'
-    flags['integration_risk'] = profile['housing'] == 'Commuter'
-    flags['study_hours_risk'] = profile['study_hours'] < 20
-    flags['gpa_drop_warning'] = profile['gpa_drop'] > 0.5
-    return flags
-
-
-def compute_weighted_risk(profile: dict, gpa: float) -> tuple[int, str]:
-    """Return weighted risk score (0-100) and risk label based on academic, financial, engagement."""
-    # Academic component (0..100): lower GPA and GPA drop and low study hours raise risk
-    acad_score = 0
-    if gpa is None or pd.isna(gpa):
-        acad_score = 50
-    else:
-        # map GPA 4.0 -> 0 risk, 0.0 -> 100 risk
-        acad_score = int(max(0, min(100, (3.5 - gpa) / 3.5 * 100)))
-        # increase for large GPA drop
-        acad_score = min(100, acad_score + int(profile['gpa_drop'] * 40))
-        # study hours penalty
-        if profile['study_hours'] < 20:
-            acad_score = min(100, acad_score + 10)
-
-    # Financial component (0..100): unpaid fees scaled + delayed aid penalty
-    fin_score = int(min(100, profile['unpaid_fees'] / 2000 * 100))
-    if profile['financial_aid_status'] == 'Delayed':
-        fin_score = min(100, fin_score + 25)
-
-    # Engagement component (0..100): low engagement -> higher risk
-    eng_score = int(max(0, min(100, 100 - profile['engagement_score'])))
-
-    # Weighted aggregation
-    total = int(round(0.5 * acad_score + 0.3 * fin_score + 0.2 * eng_score))
-
-    if total >= 70:
-        label = 'High'
-    elif total >= 40:
-        label = 'Medium'
-    else:
-        label = 'Low'
 
-    return total, label
+def _compile_notification(student: dict) -> tuple:
+    """(to, subject, body) for a rule-engine entry from get_students_with_alerts."""
+    name = student.get('name', student.get('student_id'))
+    subject = f"Risk alerts for {name} ({student.get('risk_level', 'Unknown')})"
+    compiled = "\n".join([f"- [{a.get('severity').upper()}] {a.get('type')}: {a.get('message')}" for a in student.get('alerts', [])])
+    return f"{student['student_id'].lower()}@example.edu", subject, compiled
+
+
+def _bulk_notify(students: list) -> None:
+    """Record one notification per student in a single write and queue their emails."""
+    messages = [_compile_notification(s) for s in students]
+    add_alerts([(s['student_id'], subject, body) for s, (_, subject, body) in zip(students, messages)], advisor='Advisor')
+    job_ids, info = queue_emails(messages)
+    st.session_state['bulk_notify'] = {'total': len(students), 'job_ids': job_ids, 'info': info}
+
+
+def _render_bulk_progress() -> bool:
+    """Progress of the last bulk notify; True once every email has been sent or has failed."""
+    bulk = st.session_state.get('bulk_notify')
+    if not bulk:
+        return True
+    job_ids = bulk['job_ids']
+    if not job_ids:
+        st.warning(f"Recorded {bulk['total']} in-app notifications. Emails not sent: {bulk['info']}")
+        return True
+    status = email_status(job_ids)
+    sent, failed = status.get('sent', 0), status.get('failed', 0)
+    pending = len(job_ids) - sent - failed
+    st.progress((sent + failed) / len(job_ids),
+                text=f"Bulk notify: {sent} sent, {failed} failed, {pending} pending of {len(job_ids)} emails")
+    return pending == 0
+
+
+if hasattr(st, 'fragment'):
+    @st.fragment(run_every=1.0)
+    def _poll_bulk_progress() -> None:
+        # refresh only this block while emails are in flight, then rerun the page once to stop polling
+        if _render_bulk_progress():
+            st.session_state['bulk_notify']['done'] = True
+            st.rerun()
+else:
+    def _poll_bulk_progress() -> None:
+        if _render_bulk_progress():
+            st.session_state['bulk_notify']['done'] = True
 
 
 def render(navigate_to):
@@ -258,31 +102,24 @@ def render(navigate_to):
 
     st.divider()
 
-    # Load data with cached synthetic metrics
-    df_raw = load_data()
-    df = _prepare_student_dataset(df_raw)
+    # Shared dataset with cached synthetic metrics
+    df = load_enriched_dataset()
 
-    # Generate in-app alerts from rule engine and enqueue them de-duplicated
+    # Rule-engine alerts come from a feed cached per dataset/rules version;
+    # reruns only write entries the feed has not recorded yet
     _ensure_alerts_state()
-    if 'alerts_digest' not in st.session_state:
-        st.session_state['alerts_digest'] = set()
-
+    feed = None
     students_with_alerts = []
     try:
-        df_for_alerts = _build_alert_dataframe(df)
-        students_with_alerts, _ = AlertSystem.get_students_with_alerts(df_for_alerts)
-        for s in students_with_alerts:
-            sid = s.get('student_id')
-            for a in s.get('alerts', []):
-                subj = f"{a.get('type')} - {a.get('severity', '').upper()}"
-                msg = a.get('message', '')
-                dedup_key = (sid, a.get('type'), a.get('severity'), msg)
-                if dedup_key in st.session_state['alerts_digest']:
-                    continue
-                add_alert(sid, subj, msg, advisor='Advisor')
-                st.session_state['alerts_digest'].add(dedup_key)
+        feed = alert_feed()
+        feed.enqueue_new()
+        students_with_alerts = feed.students
+    except ValueError as exc:
+        # an invalid alert_rules.json override: say so rather than show "no alerts"
+        st.error(f"Alert rules could not be loaded: {exc}")
     except Exception:
         # Fail-safe: don't block dashboard if alert generation fails
+        feed = None
         students_with_alerts = []
 
     # Ensure at least 3 students are flagged High so advisors always see multiple cases
@@ -290,14 +127,15 @@ def render(navigate_to):
         high_count = int((df['risk_label'] == 'High').sum()) if 'risk_label' in df.columns else 0
         if high_count < 3:
             needed = 3 - high_count
-            # pick top 'needed' by computed risk_score and set them to High
-            candidates = df.sort_values('risk_score', ascending=False)
-            # skip already-high students
-            candidates = candidates[candidates['risk_label'] != 'High']
-            for sid in candidates.head(needed)['student_id'].tolist():
-                df.loc[df['student_id'] == sid, 'risk_label'] = 'High'
-                # boost visible risk_score so they appear at top
-                df.loc[df['student_id'] == sid, 'risk_score'] = max(df['risk_score'].max(), 75)
+            # top 'needed' non-High students by computed risk_score (top-K, cached per dataset version)
+            candidates = top_risk_positions(needed, exclude_label='High')
+            # override two columns by position; the rest of df stays a copy-on-write view
+            risk_label = df['risk_label'].copy()
+            risk_label.iloc[candidates] = 'High'
+            # boost visible risk_score so they appear at top
+            risk_score = df['risk_score'].copy()
+            risk_score.iloc[candidates] = max(int(risk_score.max()), 75)
+            df = df.assign(risk_label=risk_label, risk_score=risk_score)
             st.info(f"Auto-flagged {needed} students as High risk to ensure advisor attention.")
     except Exception:
         # be defensive: ignore if df missing columns
@@ -315,32 +153,25 @@ def render(navigate_to):
         st.write("")
         risk_filter = st.radio("Risk Level:", ["All", "High", "Medium", "Low"], horizontal=True, key="advisor_risk")
 
-    # Apply search filter
-    filtered_df = df.copy()
-
+    # Filters are row masks over df; only the visible page is materialized
+    mask = np.ones(len(df), dtype=bool)
     if search_query:
-        search_lower = search_query.lower()
-        filtered_df = filtered_df[
-            #(filtered_df['name'].str.lower().str.contains(search_lower, na=False)) |
-            (filtered_df['student_id'].str.lower().str.contains(search_lower, na=False))
-        ]
+        # positions in the shared enriched frame, which df still mirrors row for row
+        mask &= student_search_index().mask(search_query)
 
     # Apply risk filter (use synthesized risk_label)
     if risk_filter != "All":
-        filtered_df['risk_level'] = filtered_df['risk_label']
-        filtered_df = filtered_df[filtered_df['risk_level'] == risk_filter]
+        mask &= (df['risk_label'] == risk_filter).to_numpy()
 
     page_col, page_size_col = st.columns([2, 1])
     with page_size_col:
         page_size = st.selectbox("Students per page", [5, 10, 20], index=1, key="advisor_page_size")
-    total_pages = max(1, int((len(filtered_df) + page_size - 1) / page_size))
     if "advisor_page" not in st.session_state:
         st.session_state.advisor_page = 1
-    st.session_state.advisor_page = min(st.session_state.advisor_page, total_pages)
-    current_page = st.session_state.advisor_page
-    start_idx = (current_page - 1) * page_size
-    end_idx = start_idx + page_size
-    filtered_df = filtered_df.iloc[start_idx:end_idx]
+    page = paginate(df, st.session_state.advisor_page, page_size, mask=mask)
+    st.session_state.advisor_page = current_page = page.number
+    total_pages = page.total_pages
+    filtered_df = page.rows
 
     st.divider()
 
@@ -367,9 +198,16 @@ def render(navigate_to):
     # Risk Alerts Section
     st.markdown("### 🔴 Risk Alerts")
 
+    if 'email_jobs' not in st.session_state:
+        st.session_state['email_jobs'] = []
+    delivery = email_status(st.session_state['email_jobs'])
+    if delivery:
+        st.caption("Email delivery: " + ", ".join(f"{count} {status}" for status, count in sorted(delivery.items())))
+
     # Show top students with most critical alerts from rule engine where available
-    if students_with_alerts:
-        for idx, s in enumerate(students_with_alerts[:5]):
+    # (top-K selection over the feed's priority keys, not a sort of every alerting student)
+    if feed is not None and students_with_alerts:
+        for idx, s in enumerate(feed.top(5)):
             name = s.get('name', s.get('student_id'))
             critical_count = len([a for a in s.get('alerts', []) if a.get('severity') == 'critical'])
             risk_label = s.get('risk_level', 'Unknown')
@@ -387,14 +225,14 @@ def render(navigate_to):
                     navigate_to("student-detail", s['student_id'])
             with col_b:
                 # create a compiled message to notify
-                subject = f"Risk alerts for {name} ({risk_label})"
-                compiled = "\n".join([f"- [{a.get('severity').upper()}] {a.get('type')}: {a.get('message')}" for a in s.get('alerts', [])])
+                to_email, subject, compiled = _compile_notification(s)
                 if st.button("Notify Student", key=f"risk_notify_{s['student_id']}_{idx}"):
                     add_alert(s['student_id'], subject, compiled, advisor='Advisor')
-                    to_email = f"{s['student_id'].lower()}@example.edu"
-                    sent, info = send_email(to_email, subject, compiled)
-                    if sent:
-                        st.success(f"Email sent to {to_email}")
+                    # delivered in the background; status is reported above the alerts
+                    job_id, info = queue_email(to_email, subject, compiled)
+                    if job_id is not None:
+                        st.session_state['email_jobs'].append(job_id)
+                        st.success(f"Email to {to_email} queued")
                     else:
                         st.warning(f"Email not sent: {info}")
             with col_c:
@@ -406,7 +244,19 @@ def render(navigate_to):
 
     # Student Cards
     st.markdown("### Student List")
-    
+
+    # Bulk action over every student matching the current filters (all pages)
+    bulk_hits = feed.selected(mask) if feed is not None else np.zeros(0, dtype=bool)
+    bulk_count = int(np.count_nonzero(bulk_hits))
+    if st.button(f"📣 Notify all {bulk_count} filtered students with alerts",
+                 disabled=not bulk_count, key="bulk_notify_button"):
+        _bulk_notify([students_with_alerts[i] for i in np.flatnonzero(bulk_hits)])
+    bulk = st.session_state.get('bulk_notify')
+    if bulk and bulk['job_ids'] and not bulk.get('done'):
+        _poll_bulk_progress()
+    else:
+        _render_bulk_progress()
+
     if len(filtered_df) == 0:
         st.warning("No students found matching your criteria.")
     else:
@@ -1,20 +1,24 @@
-import math
-from typing import Dict, List
+from typing import Dict, Optional, Set
+import numpy as np
+import pandas as pd
 import streamlit as st
 from pages._alerts_lib import (
     _ensure_alerts_state,
-    acknowledge_alert,
-    send_email,
+    acknowledge_notification,
+    count_notification_page,
+    get_notification_page,
+    has_notifications,
     is_email_configured,
+    notification_filters,
+    send_email,
 )
-from utils.alert_logic import AlertSystem
-from pages.advisor_dashboard import load_data, _build_alert_dataframe
+from utils.alert_logic import AlertSystem, build_alert_frame
+from utils.alert_rules import active_rules
+from utils.dataset import dataset_version, get_student_names, load_dataset, student_search_index
+from utils.pagination import clamp_page, page_count, paginate
 
 
-def _slice(records: List[Dict], size: int, page: int) -> List[Dict]:
-    start = (page - 1) * size
-    end = start + size
-    return records[start:end]
+_ALERT_COLUMNS = ['student_id', 'student_name', 'subject', 'message', 'date', 'severity', 'idx']
 
 
 def _render_alert_card(navigate_to, student_id: str, student_name: str, alert: Dict, idx: int, source: str, unique: int):
@@ -42,7 +46,7 @@ def _render_alert_card(navigate_to, student_id: str, student_name: str, alert: D
     with col2:
         if source == "state":
             if st.button("Acknowledge", key=f"{source}_ack_{student_id}_{idx}_{unique}"):
-                ok = acknowledge_alert(student_id, idx)
+                ok = acknowledge_notification(idx)
                 if ok:
                     st.rerun()
                 else:
@@ -62,59 +66,36 @@ def _render_alert_card(navigate_to, student_id: str, student_name: str, alert: D
         )
 
 
-def _filter_records(records: List[Dict], search_query: str, severity_filter: str) -> List[Dict]:
-    filtered = records
+def _filter_mask(alerts: pd.DataFrame, search_query: str, severity_filter: str, matched_ids: Set[str]) -> np.ndarray:
+    """matched_ids: students whose ID or name matches search_query (from the search index)."""
+    mask = np.ones(len(alerts), dtype=bool)
     if search_query:
-        q = search_query.lower()
-        filtered = [r for r in filtered if q in (r['student_id'] or '').lower() or q in (r['alert'].get('subject', '').lower())]
+        q = search_query.strip().lower()
+        subjects = alerts['subject'].astype('category')
+        matching = [c for c in subjects.cat.categories if q in str(c).lower()]
+        mask &= (alerts['student_id'].isin(matched_ids) | subjects.isin(matching)).to_numpy()
     if severity_filter != "All":
-        filtered = [r for r in filtered if r['alert'].get('severity', '').capitalize() == severity_filter]
-    return filtered
-
-
-def _flatten_state_alerts(notifications: Dict[str, List[Dict]], name_lookup: Dict[str, str]) -> List[Dict]:
-    flat = []
-    for student_id, notes in notifications.items():
-        for idx, note in enumerate(notes):
-            inferred_sev = 'critical' if 'CRITICAL' in (note.get('subject') or '').upper() else 'warning'
-            flat.append({
-                'student_id': student_id,
-                'student_name': name_lookup.get(student_id, student_id),
-                'alert': {
-                    'subject': note.get('subject'),
-                    'message': note.get('message'),
-                    'date': note.get('date', ''),
-                    'severity': inferred_sev,
-                },
-                'idx': idx,
-            })
-    return flat
-
-
-def _flatten_live_alerts(name_lookup: Dict[str, str]) -> List[Dict]:
-    try:
-        df = load_data().copy()
-        df_alerts = _build_alert_dataframe(df)
-        students_with_alerts, _ = AlertSystem.get_students_with_alerts(df_alerts)
-    except Exception:
-        return []
-
-    flat = []
-    for student in students_with_alerts:
-        for alert in student.get('alerts', []):
-            sid = student.get('student_id')
-            flat.append({
-                'student_id': sid,
-                'student_name': name_lookup.get(sid, sid),
-                'alert': {
-                    'subject': alert.get('type'),
-                    'message': alert.get('message'),
-                    'date': '',
-                    'severity': alert.get('severity', 'warning'),
-                },
-                'idx': 0,
-            })
-    return flat
+        severities = alerts['severity'].astype('category')
+        matching = [c for c in severities.cat.categories if str(c).capitalize() == severity_filter]
+        mask &= severities.isin(matching).to_numpy()
+    return mask
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _live_alert_frame(version: str, rules_version: str) -> pd.DataFrame:
+    """Rule-engine alerts in priority order with student names, built once per dataset and rule version."""
+    alerts = AlertSystem.get_prioritized_alerts(build_alert_frame(load_dataset()))
+    codes, ids = pd.factorize(alerts['student_id'])
+    names = np.asarray(get_student_names(ids), dtype=object)
+    return pd.DataFrame({
+        'student_id': alerts['student_id'],
+        'student_name': names[codes] if len(codes) else alerts['student_id'],
+        'subject': alerts['type'],
+        'message': alerts['message'],
+        'date': '',
+        'severity': alerts['severity'],
+        'idx': 0,
+    })
 
 
 def render(navigate_to):
@@ -143,39 +124,66 @@ def render(navigate_to):
     if "alerts_page" not in st.session_state:
         st.session_state.alerts_page = 1
 
-    notifications = st.session_state.get('notifications', {})
-    has_notifications = any(notes for notes in notifications.values())
-    base_df = load_data()
-    name_lookup = {row['student_id']: row.get('name', row['student_id']) for _, row in base_df.iterrows() if 'student_id' in row}
+    stored = has_notifications()
+    matched_ids: Optional[Set[str]] = None
+    if search_query:
+        ids = load_dataset()['student_id']
+        positions = student_search_index().search(search_query)
+        # every student matching makes the search a no-op
+        matched_ids = set(ids.iloc[positions].tolist()) if len(positions) < len(ids) else None
 
     if not is_email_configured():
         st.info("Email sending is disabled because SMTP credentials are not configured. Set SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, and EMAIL_FROM environment variables to enable notifications.")
 
-    records = _flatten_state_alerts(notifications, name_lookup) if has_notifications else _flatten_live_alerts(name_lookup)
-    filtered_records = _filter_records(records, search_query, severity_filter)
-
-    total_pages = max(1, math.ceil(len(filtered_records) / page_size))
-    st.session_state.alerts_page = min(st.session_state.alerts_page, total_pages)
-    current_page = st.session_state.alerts_page
-
-    page_records = _slice(filtered_records, page_size, current_page)
-
-    if not page_records:
-        if has_notifications:
+    if stored:
+        # stored notifications are filtered and paged in SQL
+        searching = matched_ids is not None
+        filters = notification_filters(matched_ids, search_query.strip() if searching else '', severity_filter)
+        total_rows = count_notification_page(filters)
+        current_page = clamp_page(st.session_state.alerts_page, total_rows, page_size)
+        offset = (current_page - 1) * page_size
+        notes = get_notification_page(filters, page_size, offset)
+        names = get_student_names(n['student_id'] for n in notes)
+        records = [
+            {**note, 'student_name': name, 'idx': note['id']}
+            for note, name in zip(notes, names)
+        ]
+    else:
+        try:
+            alerts = _live_alert_frame(dataset_version(), active_rules(AlertSystem).version)
+        except ValueError as exc:
+            st.error(f"Alert rules could not be loaded: {exc}")
+            alerts = pd.DataFrame(columns=_ALERT_COLUMNS)
+        except Exception:
+            alerts = pd.DataFrame(columns=_ALERT_COLUMNS)
+        page = paginate(alerts, st.session_state.alerts_page, page_size,
+                        mask=_filter_mask(alerts, search_query if matched_ids is not None else '', severity_filter, matched_ids or set()))
+        total_rows, current_page, offset = page.total_rows, page.number, page.offset
+        records = page.rows.to_dict('records')
+    st.session_state.alerts_page = current_page
+    total_pages = page_count(total_rows, page_size)
+
+    if total_rows == 0:
+        if stored:
             st.info("No alerts match your filters.")
         else:
             st.warning("No live alerts match your filters.")
     else:
-        for unique_idx, record in enumerate(page_records):
-            source = "state" if has_notifications else "live"
+        source = "state" if stored else "live"
+        for unique_idx, record in enumerate(records):
             _render_alert_card(
                 navigate_to,
                 record['student_id'],
-                record.get('student_name', record['student_id']),
-                record['alert'],
+                record['student_name'] or record['student_id'],
+                {
+                    'subject': record['subject'],
+                    'message': record['message'],
+                    'date': record['date'],
+                    'severity': record['severity'],
+                },
                 record['idx'],
                 source,
-                unique_idx + (current_page - 1) * page_size,
+                unique_idx + offset,
             )
 
     nav_left, nav_center, nav_right = st.columns([1, 2, 1])
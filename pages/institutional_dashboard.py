@@ -3,52 +3,12 @@ import pandas as pd
 import plotly.express as px
 import numpy as np
 from datetime import datetime, timedelta
+from utils.dataset import kpi_cube, load_dataset
+from utils.kpi_cube import by_program, select_cells, summarize_kpis
 
-@st.cache_data
-def load_data():
-    """Load student data from CSV or return mock data"""
-    try:
-        df = pd.read_csv("./data/student_performance_dataset.csv")
-        if len(df) == 0:
-            raise ValueError("CSV is empty")
-        return df
-    except:
-        # Mock data fallback
-        return pd.DataFrame({
-            'student_id': ['S001', 'S002', 'S003', 'S004', 'S005', 'S006', 'S007', 'S008'],
-            'name': ['John Smith', 'Emily Davis', 'Michael Chen', 'Sarah Johnson', 'David Martinez', 'Jessica Williams', 'Alex Brown', 'Lisa Anderson'],
-            'major': ['Engineering', 'Business', 'Computer Science', 'Arts', 'Engineering', 'Business', 'Computer Science', 'Arts'],
-            'program': ['BSc', 'MSc', 'BSc', 'Diploma', 'BSc', 'MSc', 'BSc', 'Diploma'],
-            'prior_gpa': [2.1, 2.4, 2.8, 3.0, 3.2, 3.5, 2.9, 3.1],
-            'year': ['Junior', 'Sophomore', 'Senior', 'Junior', 'Senior', 'Junior', 'Sophomore', 'Senior'],
-            'graduation_year': [2025, 2026, 2024, 2025, 2024, 2025, 2026, 2024],
-            'credits': [78, 65, 110, 95, 120, 88, 72, 105],
-            'student_performance': ['Pass', 'Fail', 'Pass', 'Pass', 'Pass', 'Pass', 'Fail', 'Pass']
-        })
-
-def compute_kpis(df):
-    """Calculate key performance indicators"""
-    total_students = len(df)
-    at_risk = len(df[df['prior_gpa'] < 2.5]) if 'prior_gpa' in df.columns else 0
-    prior_gpa = df['prior_gpa'].mean() if 'prior_gpa' in df.columns and len(df) > 0 else None
-    financial_risk = len(df[df['credits'] < 30]) if 'credits' in df.columns else 0
-
-    return {
-        'total': total_students,
-        'at_risk': at_risk,
-        'prior_gpa': prior_gpa,
-        'financial_risk': financial_risk
-    }
-
-def risk_level_from_gpa(prior_gpa):
-    """Determine risk level from prior_gpa"""
-    if prior_gpa is None or pd.isna(prior_gpa):
-        return "Medium"
-    if prior_gpa < 2.5:
-        return "High"
-    elif prior_gpa < 3.4:
-        return "Medium"
-    return "Low"
+def compute_kpis(cube):
+    """Calculate key performance indicators (whole cohort, summed from the KPI cube)"""
+    return summarize_kpis(cube.cells)
 
 def render(navigate_to):
     """Render Institutional Dashboard"""
@@ -78,8 +38,9 @@ def render(navigate_to):
     st.divider()
 
     # Load data
-    df = load_data()
-    kpis = compute_kpis(df)
+    df = load_dataset()
+    cube = kpi_cube()
+    kpis = compute_kpis(cube)
 
     # KPI Cards
     st.markdown("### Key Performance Indicators")
@@ -128,17 +89,17 @@ def render(navigate_to):
 
     with col1:
         # Program filter only
-        programs = ["All Programs"] + sorted(df['program'].dropna().unique().tolist())
+        programs = ["All Programs"] + cube.programs
         selected_program = st.selectbox("Program", programs, key="program_filter")
 
     with col2:
-        # Risk filter based on prior_gpa
+        # Risk filter based on prior_gpa (institutional_risk_level, binned once per dataset version)
         risk_levels = ["All Levels", "High", "Medium", "Low"]
         selected_risk = st.selectbox("Risk Level", risk_levels, key="risk_filter")
 
         # Graduation year range
-        if 'graduation_year' in df.columns and not df['graduation_year'].dropna().empty:
-            y_min, y_max = int(df['graduation_year'].min()), int(df['graduation_year'].max())
+        if cube.year_range is not None:
+            y_min, y_max = cube.year_range
             year_range = st.slider("Graduation Year Range", min_value=y_min, max_value=y_max, value=(y_min, y_max), step=1, key="year_range")
         else:
             year_range = None
@@ -149,19 +110,15 @@ def render(navigate_to):
 
     st.markdown("---")
 
-    # Apply filters
-    df_filtered = df.copy()
-
-    if selected_program != "All Programs":
-        df_filtered = df_filtered[df_filtered['program'] == selected_program]
-
-    if selected_risk != "All Levels" and 'prior_gpa' in df_filtered.columns:
-        df_filtered['risk_level'] = df_filtered['prior_gpa'].apply(risk_level_from_gpa)
-        df_filtered = df_filtered[df_filtered['risk_level'] == selected_risk]
-
-    if year_range and 'graduation_year' in df_filtered.columns:
-        yr_min, yr_max = year_range
-        df_filtered = df_filtered[(df_filtered['graduation_year'] >= yr_min) & (df_filtered['graduation_year'] <= yr_max)]
+    # Apply filters: select the matching cube cells, then aggregate them per program
+    cells = select_cells(
+        cube,
+        program=None if selected_program == "All Programs" else selected_program,
+        risk_level=None if selected_risk == "All Levels" else selected_risk,
+        years=year_range,
+    )
+    per_program = by_program(cells)
+    has_outcomes = "student_performance" in df.columns and "program" in df.columns
 
     # ===== Charts Row 1 =====
     chart_col1, chart_col2 = st.columns(2)
@@ -169,13 +126,11 @@ def render(navigate_to):
     # 📈 Retention Trend
     with chart_col1:
         st.markdown("### 📈 Retention Trend (Using Student Performance)")
-        if "student_performance" in df_filtered.columns and "program" in df_filtered.columns:
-            trend = (
-                df_filtered.groupby("program")["student_performance"]
-                .apply(lambda x: (x == "Pass").mean() * 100)
-                .reset_index()
-                .rename(columns={"student_performance": "Pass Rate (%)"})
-            )
+        if has_outcomes:
+            trend = pd.DataFrame({
+                "program": per_program.index,
+                "Pass Rate (%)": (per_program["passed"] / per_program["students"] * 100).to_numpy(),
+            })
             if len(trend) > 0:
                 fig_trend = px.line(trend, x="program", y="Pass Rate (%)", markers=True,
                                     color_discrete_sequence=["#002855"], height=300)
@@ -197,13 +152,9 @@ def render(navigate_to):
     # 📊 Risk Factor by Program
     with chart_col2:
         st.markdown("### 📊 Risk Factor (Failing Students)")
-        if "student_performance" in df_filtered.columns and "program" in df_filtered.columns:
-            risk_data = (
-                df_filtered[df_filtered["student_performance"] == "Fail"]
-                .groupby("program")
-                .size()
-                .sort_values(ascending=False)
-            )
+        if has_outcomes:
+            failed = per_program["failed"]
+            risk_data = failed[failed > 0].sort_values(ascending=False)
             if len(risk_data) > 0:
                 fig_risk_bar = px.bar(x=risk_data.index, y=risk_data.values,
                                       labels={ "x": "Program", "y": "At-Risk Students" },
@@ -223,9 +174,9 @@ def render(navigate_to):
 
     # ===== Charts Row 2 =====
     st.markdown("### 🎯 Risk Level Distribution")
-    if "student_performance" in df_filtered.columns:
-        df_filtered["risk_category"] = df_filtered["student_performance"].map({"Fail": "High", "Pass": "Low"})
-        risk_dist = df_filtered["risk_category"].value_counts()
+    if "student_performance" in df.columns:
+        risk_dist = pd.Series({"High": int(cells["failed"].sum()), "Low": int(cells["passed"].sum())})
+        risk_dist = risk_dist[risk_dist > 0].sort_values(ascending=False)
 
         fig_risk_pie = px.pie(
             values=risk_dist.values,
@@ -1,33 +1,68 @@
-import math
 import textwrap
+from typing import Tuple
+import numpy as np
 import streamlit as st
 import pandas as pd
-from pages.advisor_dashboard import load_data, synthesize_student_profile, compute_weighted_risk
-
-
-def _brief_summary(row: pd.Series) -> str:
-    parts = []
-    gpa = row.get('gpa', None)
-    if pd.notna(gpa):
-        try:
-            g = float(gpa)
-            if g < 2.0:
-                parts.append('Low GPA')
-            elif g < 2.5:
-                parts.append('At-risk GPA')
-        except Exception:
-            pass
-    if float(row.get('unpaid_fees', 0) or 0) > 500:
-        parts.append('Unpaid fees')
-    if int(row.get('attendance_pct', 100) or 100) < 80:
-        parts.append('Low attendance')
-    if int(row.get('warnings_count', 0) or 0) >= 2:
-        parts.append('Multiple warnings')
-    if int(row.get('counseling_visits', 0) or 0) < 1 or int(row.get('engagement_score', 100) or 100) < 50:
-        parts.append('Low engagement')
-    if not parts:
-        parts.append('No major risks')
-    return ', '.join(parts[:3])
+from pages._theme import stylesheet
+from utils.dataset import dataset_version, load_enriched_dataset, student_search_index
+from utils.pagination import paginate
+
+
+_SUMMARY_PARTS = ['Unpaid fees', 'Low attendance', 'Multiple warnings', 'Low engagement']
+
+
+def _brief_summaries(df: pd.DataFrame) -> pd.Series:
+    """Column version of the per-row brief risk summary (first three risk notes)."""
+    def num(column, default):
+        if column not in df.columns:
+            return np.full(len(df), float(default))
+        values = pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        return np.where(values == 0, float(default), values)
+
+    gpa = pd.to_numeric(df['gpa'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan) if 'gpa' in df.columns else np.full(len(df), np.nan)
+    gpa_part = np.where(gpa < 2.0, 1, np.where(gpa < 2.5, 2, 0))
+    flags = [
+        num('unpaid_fees', 0) > 500,
+        np.trunc(num('attendance_pct', 100)) < 80,
+        np.trunc(num('warnings_count', 0)) >= 2,
+        (np.trunc(num('counseling_visits', 0)) < 1) | (np.trunc(num('engagement_score', 100)) < 50),
+    ]
+    code = gpa_part.astype(np.int64)
+    for bit, flag in enumerate(flags):
+        code |= flag.astype(np.int64) << (bit + 2)
+
+    def render_code(c: int) -> str:
+        parts = [None, 'Low GPA', 'At-risk GPA'][c & 3]
+        parts = [parts] if parts else []
+        parts += [label for bit, label in enumerate(_SUMMARY_PARTS) if c >> (bit + 2) & 1]
+        return ', '.join((parts or ['No major risks'])[:3])
+
+    uniques, inverse = np.unique(code, return_inverse=True)
+    return pd.Series(np.array([render_code(int(c)) for c in uniques], dtype=object)[inverse], index=df.index)
+
+
+# Rows per page of the detailed table (filtered like the cards)
+TABLE_PAGE_SIZE = 50
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _report_table(version: str) -> pd.DataFrame:
+    """Report rows, built once per dataset version."""
+    df = load_enriched_dataset()
+    label = df['risk_label'].astype(str)
+    names = df['name'] if 'name' in df.columns else pd.Series([''] * len(df), index=df.index)
+    return pd.DataFrame({
+        'Student ID': df['student_id'],
+        'Name': names,
+        'Risk': label,
+        'Summary': label + ' risk — ' + _brief_summaries(df),
+    }).reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _report_csv(version: str) -> bytes:
+    """CSV export of the whole report, built on the first download of a dataset version."""
+    return _report_table(version).to_csv(index=False).encode('utf-8')
 
 
 def render(navigate_to):
@@ -42,102 +77,26 @@ def render(navigate_to):
     if st.button("⬅️ Back to Home", use_container_width=True):
         navigate_to('institutional')
 
-    st.markdown("""
-    <style>
-        .report-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(260px, 1fr));
-            gap: 18px;
-            align-items: stretch;
-        }
-        .report-card {
-            border-radius: 14px;
-            padding: 18px;
-            border: 1px solid #E5E7EB;
-            background: linear-gradient(135deg, rgba(0,40,85,0.02), rgba(245,183,0,0.05));
-            box-shadow: 0 10px 25px rgba(15, 23, 42, 0.12);
-            min-height: 190px;
-            position: relative;
-            overflow: hidden;
-            display: flex;
-            flex-direction: column;
-        }
-        .report-card::after {
-            content: '';
-            position: absolute;
-            inset: 0;
-            border-radius: 14px;
-            border: 1px solid rgba(255, 255, 255, 0.4);
-            pointer-events: none;
-        }
-        .report-card h4 {
-            margin: 0;
-            color: #0F172A;
-            font-size: 1.05rem;
-            font-weight: 700;
-        }
-        .report-id {
-            font-size: 12px;
-            color: #6B7280;
-            margin-top: 4px;
-        }
-        .report-chip {
-            display: inline-flex;
-            align-items: center;
-            padding: 4px 12px;
-            border-radius: 9999px;
-            font-weight: 600;
-            font-size: 12px;
-            margin-top: 10px;
-        }
-        .chip-high { background: #FEE2E2; color: #991B1B; }
-        .chip-medium { background: #FEF3C7; color: #92400E; }
-        .chip-low { background: #DCFCE7; color: #065F46; }
-        .report-summary {
-            font-size: 13px;
-            color: #1F2937;
-            margin-top: 12px;
-            line-height: 1.5;
-            flex: 1;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    stylesheet("reports")
 
-    df = load_data()
     search_col, risk_col, _, _ = st.columns([2, 1, 1, 1])
     with search_col:
         search_query = st.text_input("Search by student ID or name", key="reports_search")
     with risk_col:
         risk_filter = st.selectbox("Risk filter", ["All", "High", "Medium", "Low"], key="reports_risk_filter")
 
-    # Synthesize minimal attributes and risk
-    out_rows = []
-    for _, r in df.iterrows():
-        prof = synthesize_student_profile(r)
-        score, label = compute_weighted_risk(prof, r.get('gpa', None))
-        brief = _brief_summary({**r.to_dict(), **prof})
-        out_rows.append({
-            'Student ID': r.get('student_id', ''),
-            'Name': r.get('name', ''),
-            'Risk': label,
-            'Summary': f"{label} risk — {brief}"
-        })
-
-    rep = pd.DataFrame(out_rows)
+    # Precomputed once per dataset version; reruns only filter it
+    version = dataset_version()
+    rep = _report_table(version)
 
     st.markdown("### Summary")
 
-    records = rep.to_dict("records")
+    mask = np.ones(len(rep), dtype=bool)
     if search_query:
-        q = search_query.strip().lower()
-        records = [
-            row for row in records
-            if q in str(row.get("Student ID", "")).lower()
-            or q in str(row.get("Name", "")).lower()
-        ]
+        mask = student_search_index().mask(search_query)
     if risk_filter != "All":
-        records = [row for row in records if row.get("Risk") == risk_filter]
-    if not records:
+        mask &= (rep['Risk'] == risk_filter).to_numpy()
+    if not mask.any():
         st.info("No students available to summarize.")
     else:
         if "reports_page_size" not in st.session_state:
@@ -147,9 +106,9 @@ def render(navigate_to):
 
         size_options = [6, 9, 12]
         page_size = st.selectbox("Cards per page", size_options, key="reports_page_size")
-        total_pages = max(1, math.ceil(len(records) / page_size))
-        if st.session_state.reports_page > total_pages:
-            st.session_state.reports_page = total_pages
+        page = paginate(rep, st.session_state.reports_page, page_size, mask=mask)
+        st.session_state.reports_page = page.number
+        total_pages = page.total_pages
 
         nav_left, nav_center, nav_right = st.columns([1, 2, 1])
         with nav_left:
@@ -163,9 +122,7 @@ def render(navigate_to):
                 st.session_state.reports_page = min(total_pages, st.session_state.reports_page + 1)
                 st.rerun()
 
-        start = (st.session_state.reports_page - 1) * page_size
-        end = start + page_size
-        page_records = records[start:end]
+        page_records = page.rows.to_dict("records")
 
         color_map = {
             "High": "chip-high",
@@ -189,7 +146,15 @@ def render(navigate_to):
         st.markdown(f"<div class='report-grid'>{''.join(cards)}</div>", unsafe_allow_html=True)
 
     st.markdown("### Detailed Table")
-    st.dataframe(rep.drop(columns=['Name'], errors='ignore'), use_container_width=True, hide_index=True)
-
-    csv = rep.to_csv(index=False).encode('utf-8')
-    st.download_button("Download CSV", csv, file_name="risk_report.csv", mime="text/csv")
+    if mask.any():
+        # only one page of the filtered rows is serialized to the browser
+        table = paginate(rep, st.session_state.get("reports_table_page", 1), TABLE_PAGE_SIZE, mask=mask)
+        st.session_state.reports_table_page = table.number
+        st.dataframe(table.rows.drop(columns=['Name'], errors='ignore'), use_container_width=True, hide_index=True)
+        if table.total_pages > 1:
+            st.number_input(f"Table page (of {table.total_pages}, {table.total_rows} students)",
+                            min_value=1, max_value=table.total_pages, key="reports_table_page")
+
+    # the CSV is generated when the button is clicked, once per dataset version
+    st.download_button("Download CSV", lambda: _report_csv(version), file_name="risk_report.csv",
+                       mime="text/csv", on_click="ignore")
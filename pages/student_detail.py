@@ -1,9 +1,14 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from datetime import datetime, timedelta
-from pages._alerts_lib import _ensure_alerts_state, get_alerts_for_student, acknowledge_alert
-from pages.advisor_dashboard import load_data, _prepare_student_dataset
+from pages._alerts_lib import (
+    _ensure_alerts_state,
+    acknowledge_notification,
+    add_intervention,
+    get_alerts_for_student,
+    get_interventions,
+)
+from utils.dataset import get_student_record
 
 
 def _safe_float(value, default=None):
@@ -29,18 +34,14 @@ def _safe_int(value, default=0):
     except (TypeError, ValueError):
         return default
 
-def get_student_data(student_id, df):
-    """Get specific student data"""
-    if 'student_id' not in df.columns:
-        return None
-    student = df[df['student_id'] == student_id]
-    if len(student) > 0:
-        return student.iloc[0]
-    return None
+def get_student_data(student_id):
+    """Get specific student data from the indexed shared dataset"""
+    return get_student_record(student_id)
 
 def risk_level_from_gpa(gpa):
     """Determine risk level from GPA.
-    Requirement: GPA < 2.0 is At Risk (High)."""
+    Requirement: GPA < 2.0 is At Risk (High).
+    Scalar fallback for records without the precomputed student_risk_level."""
     try:
         if gpa is None or pd.isna(gpa):
             return "Medium"
@@ -57,9 +58,8 @@ def render(student_id, navigate_to):
     """Render Student Detail View"""
     _ensure_alerts_state()
 
-    # Load data
-    df = _prepare_student_dataset(load_data())
-    student = get_student_data(student_id, df)
+    # Indexed lookup: O(1) regardless of enrollment size
+    student = get_student_data(student_id)
 
     if student is None:
         st.error(f"❌ Student {student_id} not found")
@@ -84,11 +84,11 @@ def render(student_id, navigate_to):
     notes = get_alerts_for_student(student_id)
     if notes:
         st.markdown("### 🔔 Notifications")
-        for i, n in enumerate(notes):
+        for n in notes:
             st.warning(f"**{n['subject']}** — {n['date']}\n\n{n['message']}")
-            ack_key = f"ack_note_{student_id}_{i}"
+            ack_key = f"ack_note_{student_id}_{n['id']}"
             if st.button("Acknowledge", key=ack_key):
-                ok = acknowledge_alert(student_id, i)
+                ok = acknowledge_notification(n['id'])
                 if ok:
                     st.rerun()
                 else:
@@ -98,7 +98,9 @@ def render(student_id, navigate_to):
     col1, col2, col3, col4, col5, col6 = st.columns([0.5, 2, 1.5, 1.5, 1.5, 1.5])
 
     gpa_val = _safe_float(student.get('gpa', None) if isinstance(student, pd.Series) else None, None)
-    risk_level = risk_level_from_gpa(gpa_val)
+    risk_level = student.get('student_risk_level') if isinstance(student, pd.Series) else None
+    if risk_level is None or pd.isna(risk_level):
+        risk_level = risk_level_from_gpa(gpa_val)
     if risk_level == "High":
         badge_html = '<span class="risk-badge high">🔴 High Risk</span>'
     elif risk_level == "Medium":
@@ -307,8 +309,9 @@ def render(student_id, navigate_to):
         st.markdown("### 📝 Intervention Record")
 
         # Display existing interventions
-        if student_id in st.session_state['interventions']:
-            for intervention in st.session_state['interventions'][student_id]:
+        interventions = get_interventions(student_id)
+        if interventions:
+            for intervention in interventions:
                 st.info(f"**{intervention['type']}** (by {intervention['advisor']}) - {intervention['date']}\n\n{intervention['notes']}")
         else:
             st.write("No interventions recorded yet.")
@@ -339,17 +342,7 @@ def render(student_id, navigate_to):
                 if advisor_name.strip() == "":
                     st.error("Please enter advisor name")
                 else:
-                    if student_id not in st.session_state['interventions']:
-                        st.session_state['interventions'][student_id] = []
-
-                    intervention = {
-                        'type': int_type,
-                        'advisor': advisor_name,
-                        'notes': notes,
-                        'date': datetime.now().strftime("%Y-%m-%d %H:%M")
-                    }
-
-                    st.session_state['interventions'][student_id].append(intervention)
+                    add_intervention(student_id, int_type, advisor_name, notes)
                     st.success(f"✅ Intervention recorded for {student['student_id'] if isinstance(student, pd.Series) else student_id}")
                     st.rerun()
 
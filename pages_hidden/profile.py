@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from pages import student_detail
-from pages.advisor_dashboard import load_data
+from utils.dataset import load_dataset
 
 
 def render(navigate_to):
@@ -12,7 +12,7 @@ def render(navigate_to):
     </div>
     """, unsafe_allow_html=True)
 
-    df = load_data()
+    df = load_dataset()
     if 'student_id' not in df.columns:
         st.error("Student data is missing required identifiers.")
         return
@@ -0,0 +1,178 @@
+"""
+Cold-start benchmark - process start to first byte of the login page
+
+Starts `streamlit run app.py` in a fresh process, waits for the health
+endpoint, then connects like a browser would (websocket + rerun request)
+and times the first rendered element of the login page and the end of that
+script run. Repeats for --runs fresh processes and reports the medians.
+
+    python scripts/cold_start_benchmark.py --runs 5
+
+Only the standard library and Streamlit's own protobufs are needed.
+"""
+
+import argparse
+import base64
+import json
+import os
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, Optional
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(port: int, proc: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    url = f'http://127.0.0.1:{port}/_stcore/health'
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'streamlit exited with code {proc.returncode}')
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError('server did not become healthy')
+
+
+class _WebSocket:
+    """Just enough of RFC 6455 to talk to the Streamlit server (binary frames)."""
+
+    def __init__(self, port: int, path: str = '/_stcore/stream', timeout: float = 60.0):
+        self.sock = socket.create_connection(('127.0.0.1', port), timeout=timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((
+            f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\nUpgrade: websocket\r\n'
+            f'Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n'
+            'Sec-WebSocket-Protocol: streamlit\r\n\r\n'
+        ).encode())
+        response = b''
+        while b'\r\n\r\n' not in response:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError('websocket handshake failed')
+            response += chunk
+        head, self._buffer = response.split(b'\r\n\r\n', 1)
+        if b' 101 ' not in head.split(b'\r\n', 1)[0]:
+            raise ConnectionError(head.decode(errors='replace'))
+
+    def _read(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError('websocket closed')
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+    def send(self, payload: bytes) -> None:
+        mask = os.urandom(4)
+        header = bytes([0x82])  # FIN + binary
+        if len(payload) < 126:
+            header += bytes([0x80 | len(payload)])
+        elif len(payload) < 1 << 16:
+            header += bytes([0x80 | 126]) + struct.pack('!H', len(payload))
+        else:
+            header += bytes([0x80 | 127]) + struct.pack('!Q', len(payload))
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(header + mask + masked)
+
+    def recv(self) -> bytes:
+        message = b''
+        while True:
+            first, second = self._read(2)
+            length = second & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', self._read(8))[0]
+            payload = self._read(length)
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                raise ConnectionError('websocket closed by server')
+            if opcode in (0x9, 0xA):  # ping / pong
+                continue
+            message += payload
+            if first & 0x80:
+                return message
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def measure_once(port: Optional[int] = None, timeout: float = 60.0) -> Dict[str, float]:
+    """Seconds from process start to: server healthy, first login element, login script finished."""
+    port = port or _free_port()
+    cmd = [
+        sys.executable, '-m', 'streamlit', 'run', 'app.py',
+        '--server.headless', 'true',
+        '--server.port', str(port),
+        '--server.address', '127.0.0.1',
+        '--browser.gatherUsageStats', 'false',
+    ]
+    start = time.monotonic()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_healthy(port, proc, timeout)
+        timings = {'healthy': time.monotonic() - start}
+        ws = _WebSocket(port, timeout=timeout)
+        try:
+            rerun = BackMsg()
+            rerun.rerun_script.query_string = ''
+            ws.send(rerun.SerializeToString())
+            while 'script_finished' not in timings:
+                msg = ForwardMsg()
+                msg.ParseFromString(ws.recv())
+                kind = msg.WhichOneof('type')
+                if kind == 'delta' and 'first_element' not in timings:
+                    timings['first_element'] = time.monotonic() - start
+                elif kind == 'script_finished':
+                    timings['script_finished'] = time.monotonic() - start
+        finally:
+            ws.close()
+        return timings
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help='fresh processes to start (default 3)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds to wait per stage')
+    parser.add_argument('--json', action='store_true', help='print the medians as JSON')
+    args = parser.parse_args()
+
+    runs = [measure_once(timeout=args.timeout) for _ in range(args.runs)]
+    medians = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    if args.json:
+        print(json.dumps({'runs': args.runs, **{k: round(v, 4) for k, v in medians.items()}}))
+        return
+    for i, run in enumerate(runs, 1):
+        print(f"run {i}: " + '  '.join(f"{k}={v:.3f}s" for k, v in run.items()))
+    print('median: ' + '  '.join(f"{k}={v:.3f}s" for k, v in medians.items()))
+
+
+if __name__ == '__main__':
+    main()
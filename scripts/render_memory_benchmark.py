@@ -0,0 +1,100 @@
+"""
+Render memory benchmark - peak Python allocation per page rerun
+
+Runs app.py in-process with Streamlit's AppTest as a signed-in advisor,
+renders each page once to warm the shared caches, then traces --runs
+further reruns with tracemalloc and reports the median peak allocated
+above the pre-rerun baseline (and what the rerun left allocated).
+
+    python scripts/render_memory_benchmark.py --runs 5
+    python scripts/render_memory_benchmark.py --csv big_export.csv --pages advisor alerts
+
+Alerts are written to a scratch copy of data/alerts.db unless
+ALERTS_DB_PATH is set; --csv builds its Arrow cache in a scratch directory.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from typing import Dict, List
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ['institutional', 'advisor', 'student-detail', 'alerts', 'reports', 'profile']
+
+
+def _prepare_environment(scratch: str, csv_path: str = '') -> None:
+    if not os.environ.get('ALERTS_DB_PATH'):
+        db_path = os.path.join(scratch, 'alerts.db')
+        source = os.path.join(ROOT, 'data', 'alerts.db')
+        if os.path.exists(source):
+            shutil.copy(source, db_path)
+        os.environ['ALERTS_DB_PATH'] = db_path
+    sys.path.insert(0, ROOT)
+    if csv_path:
+        from utils import dataset
+        dataset.DATA_PATH = os.path.abspath(csv_path)
+        dataset.CACHE_PATH = os.path.join(scratch, 'enriched.arrow')
+
+
+def measure(pages: List[str], runs: int, student_id: str) -> Dict[str, Dict[str, float]]:
+    """Median MB per page rerun: peak allocated above the baseline, and retained afterwards."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=600)
+    at.run()
+    at.session_state['authenticated'] = True
+    at.session_state['user'] = 'advisor1'
+    at.session_state['selected_student_id'] = student_id
+
+    results = {}
+    tracemalloc.start()
+    try:
+        for screen in pages:
+            at.session_state['current_screen'] = screen
+            at.run()  # warm-up: imports and per-version caches
+            if at.exception:
+                raise RuntimeError(f'{screen}: {at.exception[0].message}')
+            peaks, retained = [], []
+            for _ in range(runs):
+                baseline = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                at.run()
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - baseline)
+                retained.append(current - baseline)
+            results[screen] = {
+                'peak_mb': statistics.median(peaks) / 1e6,
+                'retained_mb': statistics.median(retained) / 1e6,
+            }
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help='traced reruns per page (default 3)')
+    parser.add_argument('--pages', nargs='+', choices=PAGES, default=PAGES, help='pages to measure')
+    parser.add_argument('--csv', default='', help='student CSV to load instead of data/')
+    parser.add_argument('--student', default='S0005', help='student shown on the student-detail page')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        _prepare_environment(scratch, args.csv)
+        results = measure(args.pages, args.runs, args.student)
+    if args.json:
+        print(json.dumps({page: {k: round(v, 3) for k, v in r.items()} for page, r in results.items()}))
+        return
+    for page, r in results.items():
+        print(f"{page:<15} peak={r['peak_mb']:.3f} MB  retained={r['retained_mb']:.3f} MB")
+
+
+if __name__ == '__main__':
+    main()
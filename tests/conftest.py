@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+# make the app's top-level packages (utils, pages) importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def alerts_db(tmp_path, monkeypatch):
+    """Point the alert store at a scratch database so tests never write data/alerts.db."""
+    from utils import alert_store
+    path = str(tmp_path / 'alerts.db')
+    monkeypatch.setattr(alert_store, 'DB_PATH', path)
+    return path
@@ -0,0 +1,145 @@
+"""AlertSystem: compiled rules (evaluate_frame) against the scalar API, and rule overrides."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import alert_rules
+from utils.alert_logic import AlertSystem
+
+
+@pytest.fixture
+def rules_file(tmp_path, monkeypatch):
+    """Write an alert rules override file and make it the active one."""
+    path = tmp_path / 'alert_rules.json'
+    monkeypatch.setattr(alert_rules, 'RULES_PATH', str(path))
+
+    def write(spec):
+        path.write_text(json.dumps(spec), encoding='utf-8')
+    return write
+
+
+def _frame(**columns):
+    n = len(next(iter(columns.values())))
+    return pd.DataFrame({'student_id': [f'S{i}' for i in range(n)], **columns})
+
+
+def test_rule_on_a_text_value_field(rules_file):
+    rules_file({'rules': [{
+        'alert_type': 'Financial', 'severity': 'critical',
+        'when': [{'field': 'financial_aid_status', 'op': '==', 'value': 'delayed'}],
+        'message': 'Aid status: {}', 'value_field': 'financial_aid_status',
+    }]})
+    alerts, scores = AlertSystem.evaluate_frame(_frame(financial_aid_status=['Delayed', 'On time', 'DELAYED']))
+    assert alerts['student_id'].tolist() == ['S0', 'S2']
+    assert alerts['message'].tolist() == ['Aid status: delayed', 'Aid status: delayed']
+    assert scores['critical_alert_count'].tolist() == [1, 0, 1]
+
+
+def _random_alert_frame(seed, n=300):
+    rng = np.random.default_rng(seed)
+    return _frame(
+        gpa=np.round(rng.uniform(0.5, 4.0, n), 2),
+        credits=rng.integers(0, 120, n),
+        warnings=rng.integers(0, 4, n),
+        unpaid_fees=rng.choice([0, 150, 300, 600, 1200], n),
+        financial_aid_status=rng.choice(['On time', 'Delayed', 'Payment Plan'], n),
+        attendance=rng.integers(40, 100, n),
+        counseling_visits=rng.integers(0, 3, n),
+        engagement_score=rng.integers(20, 100, n),
+    )
+
+
+def _assert_frame_matches_scalar(df):
+    alerts, scores = AlertSystem.evaluate_frame(df)
+    for i, row in enumerate(df.to_dict('records')):
+        expected = AlertSystem.calculate_comprehensive_risk_score(row)
+        got = alerts[alerts['student_id'] == row['student_id']]
+        assert [
+            {'type': t, 'severity': s, 'message': m}
+            for t, s, m in zip(got['type'].tolist(), got['severity'].tolist(), got['message'].tolist())
+        ] == expected['alerts'], row
+        for column in ('overall_score', 'risk_level', 'academic_score', 'financial_score',
+                       'engagement_score', 'critical_alert_count', 'warning_alert_count'):
+            assert scores[column].iloc[i] == expected[column], (column, row)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_evaluate_frame_matches_scalar_scoring(seed):
+    _assert_frame_matches_scalar(_random_alert_frame(seed))
+
+
+def test_threshold_overrides_reach_the_scalar_methods(rules_file):
+    rules_file({'thresholds': {'GPA_CRITICAL': 1.8, 'ATTENDANCE_WARNING': 75}})
+    assert AlertSystem.calculate_gpa_alert(1.9)[0] == 'warning'
+    assert AlertSystem.calculate_gpa_alert(1.7)[0] == 'critical'
+    assert AlertSystem.calculate_attendance_alert(77)[0] == 'none'
+
+    alerts, _ = AlertSystem.evaluate_frame(_frame(gpa=[1.9]))
+    scalar = AlertSystem.calculate_comprehensive_risk_score({'gpa': 1.9})
+    assert alerts.loc[alerts['type'] == 'GPA', 'severity'].tolist() == ['warning']
+    assert [a['severity'] for a in scalar['alerts'] if a['type'] == 'GPA'] == ['warning']
+    _assert_frame_matches_scalar(_random_alert_frame(2))
+
+
+def test_replaced_rules_reach_the_scalar_methods(rules_file):
+    rules_file({'rules': [
+        {'alert_type': 'GPA', 'severity': 'warning', 'when': [{'field': 'gpa', 'op': '<', 'value': 3.2}],
+         'message': 'GPA below 3.2: {}', 'value_field': 'gpa'},
+        {'alert_type': 'Housing', 'severity': 'critical', 'when': [{'field': 'warnings', 'op': '>=', 'value': 3}],
+         'message': 'Probation review'},
+    ]})
+    assert AlertSystem.calculate_gpa_alert(3.0) == ('warning', 'GPA below 3.2: 3.0', '#ff7f0e')
+    assert AlertSystem.calculate_attendance_alert(10)[0] == 'none'
+    _assert_frame_matches_scalar(_random_alert_frame(3))
+
+
+def test_missing_values_follow_the_scalar_semantics():
+    # a float NaN is truthy for the scalar `float(x) if x else default`, so it stays NaN and
+    # fails every threshold; None and 0 take the default
+    nan = np.nan
+    df = _frame(
+        gpa=pd.Series([nan, None, 0, 1.5, nan, 3.1], dtype=object),
+        credits=[nan, 10, 0, nan, 45, 90],
+        unpaid_fees=[nan, 0, 700, 200, nan, 0],
+        financial_aid_status=['Delayed', 'On time', 'On time', 'Delayed', 'On time', 'On time'],
+        attendance=[nan, 60, 0, 85, nan, 95],
+        counseling_visits=[0, 1, 2, 0, 1, 3],
+        engagement_score=[nan, 40, 0, nan, 80, 90],
+    )
+    _assert_frame_matches_scalar(df)
+    _assert_frame_matches_scalar(df.astype({'gpa': float}))
+
+
+def test_numeric_string_thresholds_are_coerced(rules_file):
+    rules_file({'thresholds': {'GPA_CRITICAL': '1.8'}})
+    assert AlertSystem.calculate_gpa_alert(1.9)[0] == 'warning'
+    assert AlertSystem.calculate_gpa_alert(1.7)[0] == 'critical'
+
+
+@pytest.mark.parametrize('spec, error', [
+    ({'thresholds': {'GPA_CRITICAL': 'low'}}, "'GPA_CRITICAL'.*must be a number"),
+    ({'thresholds': {'GPA_CRITICAL': True}}, 'must be a number'),
+    ({'thresholds': {'GPA_CRITICL': 1.8}}, 'Unknown threshold'),
+    ({'rules': [{'alert_type': 'GPA', 'severity': 'warning', 'when': [{'field': 'GPA', 'op': '<', 'value': 2}],
+                 'message': 'Low GPA'}]}, "Unknown field 'GPA'"),
+    ({'rules': [{'alert_type': 'GPA', 'severity': 'warning', 'when': [{'field': 'gpa', 'op': '<', 'value': 'two'}],
+                 'message': 'Low GPA'}]}, 'gpa value in GPA rule must be a number'),
+    ({'rules': [{'alert_type': 'GPA', 'severity': 'warning', 'when': [{'field': 'gpa', 'op': '<', 'value': 2}],
+                 'message': 'Low GPA: {}', 'value_field': 'grade'}]}, "Unknown value_field 'grade'"),
+])
+def test_invalid_overrides_fail_when_loaded(rules_file, spec, error):
+    rules_file(spec)
+    with pytest.raises(ValueError, match=error):
+        alert_rules.active_rules(AlertSystem)
+
+
+def test_credits_alert_for_non_freshmen_uses_the_active_rule(rules_file):
+    assert AlertSystem.calculate_credits_alert(20, is_freshman=True) == ('critical', 'Dropout risk: 20.0 credits', '#d62728')
+    assert AlertSystem.calculate_credits_alert(20)[:2] == ('warning', 'Dropout risk: 20.0 credits')
+    rules_file({'rules': [{'alert_type': 'Credits', 'severity': 'critical', 'when': [{'field': 'credits', 'op': '<', 'value': 45}],
+                           'message': 'Behind on credits: {}', 'value_field': 'credits'}]})
+    assert AlertSystem.calculate_credits_alert(40) == ('warning', 'Behind on credits: 40.0', '#ff7f0e')
+    assert AlertSystem.calculate_credits_alert(50)[0] == 'none'
@@ -0,0 +1,108 @@
+"""alert_store: alert log de-duplication, notifications, acknowledgements and interventions."""
+
+import sqlite3
+
+import pandas as pd
+
+from utils import alert_store
+
+
+def _alerts(*rows):
+    return pd.DataFrame(list(rows), columns=['student_id', 'type', 'severity', 'message'])
+
+
+def test_identical_alerts_are_logged_once():
+    rows = [('S1', 'GPA', 'critical', 'Critical GPA: 1.5'), ('S2', 'Attendance', 'warning', 'Attendance: 60.0%')]
+    assert alert_store.log_alerts(rows) == 2
+    assert alert_store.log_alerts(rows) == 0
+    assert alert_store.log_alert('S1', 'GPA', 'warning', 'Warning GPA: 2.2') == 1
+    assert alert_store._fetch("SELECT COUNT(*) AS n FROM alert_logs")[0]['n'] == 3
+
+
+def test_log_alert_frame_skips_a_repeated_table():
+    alerts = _alerts(('S1', 'GPA', 'critical', 'Critical GPA: 1.5'))
+    assert alert_store.log_alert_frame(alerts) == 1
+    assert alert_store.log_alert_frame(alerts) == 0
+    grown = _alerts(('S1', 'GPA', 'critical', 'Critical GPA: 1.5'), ('S3', 'Warnings', 'warning', '1 warning(s)'))
+    assert alert_store.log_alert_frame(grown) == 1
+
+
+def _add_notifications(n):
+    rows = [(f'S{i}', f"GPA - {'CRITICAL' if i % 3 == 0 else 'WARNING'}", f'message {i}') for i in range(n)]
+    return alert_store.add_notifications(rows, dedup_keys=[f'key{i}' for i in range(n)])
+
+
+def test_notifications_are_deduplicated_and_paged():
+    assert _add_notifications(12) == 12
+    assert _add_notifications(12) == 0
+    assert alert_store.count_notifications() == 12
+    pages = [alert_store.list_notifications(limit=5, offset=offset) for offset in (0, 5, 10)]
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert [row['student_id'] for page in pages for row in page] == [f'S{i}' for i in range(12)]
+
+
+def test_notification_filters():
+    _add_notifications(12)
+    assert alert_store.count_notifications(critical=True) == 4
+    assert alert_store.count_notifications(critical=False) == 8
+    assert [r['severity'] for r in alert_store.list_notifications(critical=True)] == ['critical'] * 4
+    # student ids and subject text are OR-ed, as for the alerts page search
+    assert alert_store.count_notifications(student_ids=['S1', 'S2'], subject_contains='nothing') == 2
+    assert alert_store.count_notifications(student_ids=[], subject_contains='critical') == 4
+    assert alert_store.count_notifications(student_ids=['S3', 'S4'], critical=True) == 1
+
+
+def test_explicit_severity_wins_over_the_subject():
+    alert_store.add_notifications([('S1', 'Follow up', 'Critical GPA: 1.5')], severities=['critical'])
+    alert_store.add_notifications([('S2', 'Advisor note', 'check in')])
+    assert [r['severity'] for r in alert_store.list_notifications()] == ['critical', 'warning']
+
+
+def test_acknowledge_records_the_acknowledgement_and_an_intervention():
+    _add_notifications(2)
+    first = alert_store.list_notifications()[0]
+    assert alert_store.acknowledge_notification(first['id'], acknowledged_by='advisor1')
+    assert not alert_store.acknowledge_notification(first['id'])
+    assert alert_store.count_notifications() == 1
+    acknowledged = alert_store.list_notifications(status=alert_store.ACKNOWLEDGED)
+    assert [row['id'] for row in acknowledged] == [first['id']]
+    assert acknowledged[0]['acknowledged_at']
+    assert alert_store.notifications_for_student('S0') == []
+    interventions = alert_store.list_interventions('S0')
+    assert [(i['alert_type'], i['status'], i['notes']) for i in interventions] == [
+        ('Notification Acknowledged', 'completed', 'message 0'),
+    ]
+
+
+def test_interventions_are_listed_newest_first():
+    ids = [alert_store.add_intervention('S1', f'Meeting {i}', 'advisor1', status='open' if i % 2 else 'completed')
+           for i in range(5)]
+    alert_store.add_intervention('S2', 'Call', 'advisor1')
+    assert [i['id'] for i in alert_store.list_interventions('S1')] == ids[::-1]
+    assert [i['alert_type'] for i in alert_store.list_interventions('S1', status='open')] == ['Meeting 3', 'Meeting 1']
+    assert len(alert_store.list_interventions('S1', limit=2, offset=4)) == 1
+
+
+def test_existing_notifications_get_a_severity_column(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, student_id TEXT NOT NULL, subject TEXT, message TEXT,
+            advisor TEXT, status TEXT NOT NULL DEFAULT 'open', dedup_key TEXT, created_at TEXT NOT NULL,
+            acknowledged_at TEXT
+        );
+        INSERT INTO notifications (student_id, subject, message, created_at) VALUES
+            ('S1', 'GPA - CRITICAL', 'Critical GPA: 1.5', '2024-01-01 00:00:00'),
+            ('S2', 'Attendance - WARNING', 'Attendance: 60.0%', '2024-01-01 00:00:00'),
+            ('S3', NULL, 'note', '2024-01-01 00:00:00');
+    """)
+    conn.close()
+
+    assert [r['severity'] for r in alert_store.list_notifications(db_path=path)] == ['critical', 'warning', 'warning']
+    assert alert_store.count_notifications(critical=True, db_path=path) == 1
+    plan = alert_store._fetch(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM notifications WHERE status = 'open' AND severity = 'critical'",
+        db_path=path,
+    )
+    assert any('ix_notifications_status_severity' in row['detail'] for row in plan)
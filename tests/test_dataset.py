@@ -0,0 +1,77 @@
+"""Arrow cache builds: streamed cold builds and incremental re-scoring."""
+
+import pandas as pd
+
+from utils import dataset
+from utils.dataset import DATA_PATH
+
+
+def _numeric_id_csv(path, rows=300):
+    df = pd.read_csv(DATA_PATH).iloc[:rows].copy()
+    df['student_id'] = range(1000, 1000 + rows)
+    df.to_csv(path, index=False)
+    return df
+
+
+def _count_rescored(monkeypatch):
+    scored = []
+    original = dataset.score_frame_parallel
+
+    def counting(df, *args, **kwargs):
+        scored.append(len(df))
+        return original(df, *args, **kwargs)
+
+    monkeypatch.setattr(dataset, 'score_frame_parallel', counting)
+    return scored
+
+
+def test_streamed_cache_rescores_only_the_changed_row(tmp_path, monkeypatch):
+    source, cache = str(tmp_path / 'students.csv'), str(tmp_path / 'students.enriched.arrow')
+    df = _numeric_id_csv(source)
+    built = dataset._stream_build(source, cache, chunk_rows=64)
+    assert built.enriched['student_id'].tolist() == [str(i) for i in df['student_id']]
+
+    df.loc[17, 'prior_gpa'] = 1.23
+    df.to_csv(source, index=False)
+    rescored = _count_rescored(monkeypatch)
+    frames = dataset._build_frames(source, cache)
+
+    assert rescored == [1]
+    assert frames.enriched['student_id'].dtype == built.enriched['student_id'].dtype
+    assert frames.enriched.loc[17, 'prior_gpa'] == 1.23
+    # same result as building the changed CSV from scratch
+    rebuilt = dataset._stream_build(source, str(tmp_path / 'fresh.arrow'), chunk_rows=64)
+    pd.testing.assert_frame_equal(frames.enriched, rebuilt.enriched)
+
+
+def test_streamed_build_matches_in_memory_build(tmp_path, monkeypatch):
+    source = str(tmp_path / 'students.csv')
+    _numeric_id_csv(source, rows=500)
+    streamed = dataset._stream_build(source, str(tmp_path / 'a.arrow'), chunk_rows=128)
+
+    monkeypatch.setattr(dataset, '_stream_build', lambda *args, **kwargs: None)
+    in_memory = dataset._build_frames(source, str(tmp_path / 'b.arrow'))
+    pd.testing.assert_frame_equal(streamed.enriched, in_memory.enriched)
+    assert streamed.version == in_memory.version
+
+
+def test_reordered_csv_follows_the_new_order_without_rescoring(tmp_path, monkeypatch):
+    source, cache = str(tmp_path / 'students.csv'), str(tmp_path / 'students.enriched.arrow')
+    df = _numeric_id_csv(source, rows=200)
+    dataset._stream_build(source, cache, chunk_rows=64)
+
+    df.iloc[::-1].to_csv(source, index=False)
+    rescored = _count_rescored(monkeypatch)
+    frames = dataset._build_frames(source, cache)
+    assert rescored == []
+    assert frames.enriched['student_id'].tolist() == [str(i) for i in df['student_id'][::-1]]
+    rebuilt = dataset._stream_build(source, str(tmp_path / 'fresh.arrow'), chunk_rows=64)
+    pd.testing.assert_frame_equal(frames.enriched, rebuilt.enriched)
+
+    # the cache now stores row hashes in the new order: a one-row edit re-scores one row
+    df = df.iloc[::-1].reset_index(drop=True)
+    df.loc[5, 'prior_gpa'] = 1.11
+    df.to_csv(source, index=False)
+    frames = dataset._build_frames(source, cache)
+    assert rescored == [1]
+    assert frames.enriched.loc[5, 'prior_gpa'] == 1.11
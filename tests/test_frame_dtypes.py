@@ -0,0 +1,46 @@
+"""compact_frame keeps every value while shrinking the enriched frame; CompactDtypes agrees chunk-wise."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset import DATA_PATH, normalize_dataset
+from utils.frame_dtypes import CompactDtypes, compact_frame
+from utils.risk_engine import AID_OPTIONS, score_frame
+
+
+@pytest.fixture(scope='module')
+def enriched():
+    return score_frame(normalize_dataset(pd.read_csv(DATA_PATH)))
+
+
+def test_compact_enriched_frame_keeps_values_in_half_the_memory(enriched):
+    compact = compact_frame(enriched)
+    pd.testing.assert_frame_equal(compact, enriched, check_dtype=False, check_categorical=False, check_exact=True)
+    assert compact['financial_aid_status'].cat.categories.tolist() == AID_OPTIONS
+    assert compact['risk_flags'].dtype == np.uint16
+    assert compact['age'].dtype == np.int8
+    assert compact.memory_usage(deep=True).sum() <= 0.5 * enriched.memory_usage(deep=True).sum()
+
+
+def test_unknown_categories_and_lossy_floats_are_kept():
+    df = pd.DataFrame({
+        'financial_aid_status': ['On time', 'Waived', None],
+        'halves': [0.5, 1.25, np.nan],
+        'tenths': [0.1, 0.2, 0.3],
+        'big': [1, 2, 2 ** 40],
+    })
+    compact = compact_frame(df)
+    pd.testing.assert_frame_equal(compact, df, check_dtype=False, check_categorical=False, check_exact=True)
+    assert compact['financial_aid_status'].isna().tolist() == [False, False, True]
+    assert compact['halves'].dtype == np.float32
+    assert compact['tenths'].dtype == np.float64
+    assert compact['big'].dtype == np.int64
+
+
+def test_compact_dtypes_of_chunks_match_the_whole_frame(enriched):
+    sample = enriched.iloc[:900]
+    observed = CompactDtypes()
+    for start in range(0, len(sample), 250):
+        observed.observe(sample.iloc[start:start + 250])
+    assert observed.dtypes() == compact_frame(sample).dtypes.to_dict()
@@ -0,0 +1,100 @@
+"""KPI cube answers against the row filters the institutional dashboard used before it."""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.kpi_cube import build_kpi_cube, by_program, select_cells, summarize_kpis
+
+
+def risk_level_from_gpa(prior_gpa):
+    """The dashboard's original per-row risk level."""
+    if prior_gpa is None or pd.isna(prior_gpa):
+        return "Medium"
+    if prior_gpa < 2.5:
+        return "High"
+    elif prior_gpa < 3.4:
+        return "Medium"
+    return "Low"
+
+
+@pytest.fixture(scope='module')
+def students():
+    rng = np.random.default_rng(3)
+    n = 1500
+    gpa = rng.uniform(1.0, 4.0, n).round(2)
+    gpa[::13] = np.nan
+    gpa[:4] = [2.5, 3.4, 2.49, 3.39]
+    years = rng.integers(2022, 2028, n).astype(float)
+    years[::17] = np.nan
+    return pd.DataFrame({
+        'student_id': [f'S{i:04d}' for i in range(n)],
+        'program': rng.choice(['BSc', 'MSc', 'Diploma', 'PhD'], n),
+        'prior_gpa': gpa,
+        'credits': rng.integers(0, 120, n),
+        'graduation_year': years,
+        'student_performance': rng.choice(['Pass', 'Fail'], n, p=[0.7, 0.3]),
+    })
+
+
+def _filter_rows(df, program, risk_level, years):
+    """The page's original filters, applied to rows."""
+    df = df.copy()
+    if program is not None:
+        df = df[df['program'] == program]
+    if risk_level is not None:
+        df = df[df['prior_gpa'].apply(risk_level_from_gpa) == risk_level]
+    if years is not None:
+        df = df[(df['graduation_year'] >= years[0]) & (df['graduation_year'] <= years[1])]
+    return df
+
+
+FILTERS = list(itertools.product(
+    [None, 'BSc', 'PhD', 'Unknown'],
+    [None, 'High', 'Medium', 'Low'],
+    [None, (2022, 2027), (2024, 2025), (2030, 2031)],
+))
+
+
+@pytest.mark.parametrize('precomputed_levels', [False, True])
+def test_filtered_kpis_and_program_measures_match_row_filters(students, precomputed_levels):
+    df = students
+    if precomputed_levels:
+        # the enriched frame carries the level, so the cube does not recompute it
+        df = df.assign(institutional_risk_level=df['prior_gpa'].apply(risk_level_from_gpa))
+    cube = build_kpi_cube(df)
+    assert cube.programs == ['BSc', 'Diploma', 'MSc', 'PhD']
+    assert cube.year_range == (2022, 2027)
+
+    for program, risk_level, years in FILTERS:
+        rows = _filter_rows(students, program, risk_level, years)
+        cells = select_cells(cube, program=program, risk_level=risk_level, years=years)
+        kpis = summarize_kpis(cells)
+        case = (program, risk_level, years)
+        assert kpis['total'] == len(rows), case
+        assert kpis['at_risk'] == int((rows['prior_gpa'] < 2.5).sum()), case
+        assert kpis['financial_risk'] == int((rows['credits'] < 30).sum()), case
+        if rows['prior_gpa'].notna().any():
+            assert kpis['prior_gpa'] == pytest.approx(rows['prior_gpa'].mean()), case
+        else:
+            assert kpis['prior_gpa'] is None, case
+
+        per_program = by_program(cells)
+        pass_rate = rows.groupby('program')['student_performance'].apply(lambda x: (x == 'Pass').mean() * 100)
+        failing = rows[rows['student_performance'] == 'Fail'].groupby('program').size()
+        assert per_program.index.tolist() == pass_rate.index.tolist(), case
+        assert (per_program['passed'] / per_program['students'] * 100).tolist() == pytest.approx(pass_rate.tolist()), case
+        failed = per_program['failed']
+        assert failed[failed > 0].to_dict() == failing.to_dict(), case
+
+
+def test_unfiltered_kpis_without_optional_columns():
+    df = pd.DataFrame({'student_id': ['S1', 'S2', 'S3'], 'program': ['BSc', 'BSc', 'MSc']})
+    cube = build_kpi_cube(df)
+    assert cube.year_range is None and not cube.has_risk_level
+    # filters on absent dimensions are ignored, as the page skipped them
+    cells = select_cells(cube, risk_level='High', years=(2020, 2021))
+    assert summarize_kpis(cells) == {'total': 3, 'at_risk': 0, 'prior_gpa': None, 'financial_risk': 0}
+    assert by_program(cells)['students'].to_dict() == {'BSc': 2, 'MSc': 1}
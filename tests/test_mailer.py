@@ -0,0 +1,82 @@
+"""MailQueue against a local aiosmtpd server (plain SMTP, security='none')."""
+
+import socket
+
+import pytest
+
+from utils.mailer import FAILED, SENT, MailQueue, SmtpSettings
+
+controller_module = pytest.importorskip('aiosmtpd.controller')
+
+
+class RecordingHandler:
+    """Accepts mail, except 550 for rejected@ and a single 451 for busy@."""
+
+    def __init__(self):
+        self.delivered = []
+        self.deferred = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('rejected@'):
+            return '550 5.1.1 No such user'
+        if address.startswith('busy@') and address not in self.deferred:
+            self.deferred.add(address)
+            return '451 4.3.0 Try again later'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.extend(envelope.rcpt_tos)
+        return '250 Message accepted'
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname='127.0.0.1', port=_free_port())
+    controller.start()
+    try:
+        yield handler, SmtpSettings('127.0.0.1', controller.port, 'advisor@example.edu',
+                                    security='none', timeout=5.0)
+    finally:
+        controller.stop()
+
+
+def test_batch_is_delivered_over_plain_smtp(smtp_server):
+    handler, settings = smtp_server
+    mail_queue = MailQueue(settings, workers=2, batch_size=3, backoff=0.01)
+    try:
+        messages = [(f'student{i}@example.edu', f'Alert {i}', 'Please see your advisor.') for i in range(7)]
+        job_ids = mail_queue.submit_many(messages)
+        assert mail_queue.wait(job_ids, timeout=10)
+        assert mail_queue.summary(job_ids) == {SENT: 7}
+    finally:
+        mail_queue.close(timeout=5)
+    assert sorted(handler.delivered) == sorted(to for to, _, _ in messages)
+
+
+def test_permanent_rejection_fails_and_transient_one_is_retried(smtp_server):
+    handler, settings = smtp_server
+    mail_queue = MailQueue(settings, workers=1, backoff=0.01)
+    try:
+        rejected, busy, ok = mail_queue.submit_many([
+            ('rejected@example.edu', 'Alert', 'body'),
+            ('busy@example.edu', 'Alert', 'body'),
+            ('ok@example.edu', 'Alert', 'body'),
+        ])
+        assert mail_queue.wait([rejected, busy, ok], timeout=10)
+
+        job = mail_queue.status(rejected)
+        assert job.status == FAILED and job.attempts == 1 and '550' in job.error
+        job = mail_queue.status(busy)
+        assert job.status == SENT and job.attempts == 2
+        assert mail_queue.status(ok).status == SENT
+    finally:
+        mail_queue.close(timeout=5)
+    assert sorted(handler.delivered) == ['busy@example.edu', 'ok@example.edu']
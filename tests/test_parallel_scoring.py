@@ -0,0 +1,40 @@
+"""score_frame_parallel and score_chunks against score_frame, through real worker processes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.parallel_scoring import score_chunks, score_frame_parallel
+from utils.risk_engine import score_frame
+
+
+def _frame(n=300, with_gpa=True):
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({
+        'student_id': [f'S{i:05d}' for i in rng.permutation(n)],
+        'credits': rng.integers(0, 130, n),
+    })
+    if with_gpa:
+        gpa = rng.uniform(0.0, 4.0, n).round(2)
+        gpa[::9] = np.nan
+        df.insert(1, 'gpa', gpa)
+    return df
+
+
+@pytest.mark.parametrize('with_gpa', [True, False])
+def test_score_frame_parallel_matches_score_frame(with_gpa):
+    df = _frame(with_gpa=with_gpa)
+    # chunks of 70 rows: uneven, so the last chunk is short
+    scored = score_frame_parallel(df, workers=2, chunk_rows=70, min_rows=10)
+    pd.testing.assert_frame_equal(scored, score_frame(df))
+
+
+@pytest.mark.parametrize('with_gpa', [True, False])
+def test_score_chunks_matches_score_frame(with_gpa):
+    df = _frame(with_gpa=with_gpa)
+    chunks = [df.iloc[start:start + 50] for start in range(0, len(df), 50)]
+    # the first two chunks are scored in-process, the other four by the workers
+    scored = list(score_chunks(chunks, workers=2, min_rows=100))
+    assert [len(chunk) for chunk in scored] == [50] * 6
+    for chunk, result in zip(chunks, scored):
+        pd.testing.assert_frame_equal(result, score_frame(chunk))
@@ -0,0 +1,77 @@
+"""top_k against a full stable sort, and the Risk Alerts panel's top five against the sorted alert feed."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pages._alerts_lib import AlertFeed
+from utils.alert_logic import AlertSystem, _priority_order, priority_keys
+from utils.ranking import top_k
+
+
+def _sorted_head(values, k, mask=None, largest=True):
+    """Reference: stable sort of every candidate, then the first k."""
+    values = np.asarray(values, dtype=np.float64)
+    candidates = np.flatnonzero(~np.isnan(values) if mask is None else mask & ~np.isnan(values))
+    keys = -values[candidates] if largest else values[candidates]
+    return candidates[np.argsort(keys, kind='stable')][:max(0, k)]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+@pytest.mark.parametrize('k', [0, 1, 5, 37, 999, 2000])
+@pytest.mark.parametrize('largest', [True, False])
+def test_top_k_matches_a_stable_sort(seed, k, largest):
+    rng = np.random.default_rng(seed)
+    # few distinct values, so the k-th value is almost always tied
+    values = rng.integers(0, 12, 1000).astype(float)
+    values[rng.choice(1000, 50, replace=False)] = np.nan
+    mask = rng.random(1000) < 0.6
+    assert top_k(values, k, largest=largest).tolist() == _sorted_head(values, k, largest=largest).tolist()
+    assert top_k(values, k, mask=mask, largest=largest).tolist() == _sorted_head(values, k, mask, largest).tolist()
+
+
+def test_top_k_edge_cases():
+    assert top_k([], 3).tolist() == []
+    assert top_k([np.nan, np.nan], 1).tolist() == []
+    assert top_k([1.0, 2.0], -1).tolist() == []
+    assert top_k([3, 1, 3, 2], 2).tolist() == [0, 2]
+    assert top_k([3, 1, 3, 2], 2, largest=False).tolist() == [1, 3]
+    assert top_k([-np.inf, 5, np.inf], 3).tolist() == [2, 1, 0]
+
+
+def _alert_frame(seed, n=400):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'student_id': [f'S{i:04d}' for i in range(n)],
+        'gpa': rng.choice([1.5, 2.2, 3.5], n),
+        'credits': rng.choice([10, 90], n),
+        'warnings': rng.integers(0, 3, n),
+        'unpaid_fees': rng.choice([0, 200, 800], n),
+        'financial_aid_status': rng.choice(['On time', 'Delayed'], n),
+        'attendance': rng.choice([60, 95], n),
+        'counseling_visits': rng.integers(0, 2, n),
+        'engagement_score': rng.choice([30, 80], n),
+    })
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_priority_order_is_critical_then_total(seed):
+    _, scores = AlertSystem.evaluate_frame(_alert_frame(seed))
+    counts = scores['alert_count'].to_numpy()
+    critical = scores['critical_alert_count'].to_numpy()
+    alerting = np.flatnonzero(counts > 0)
+    expected = alerting[np.lexsort((-counts[alerting], -critical[alerting]))]
+    assert _priority_order(scores).tolist() == expected.tolist()
+    keys = priority_keys(critical, counts)
+    assert top_k(keys, 25, mask=counts > 0).tolist() == expected[:25].tolist()
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_risk_alerts_panel_matches_the_head_of_the_sorted_feed(seed):
+    students, _ = AlertSystem.get_students_with_alerts(_alert_frame(seed))
+    feed = AlertFeed(students)
+    # the cut after the fifth card falls inside a run of tied priorities
+    assert feed.priority[4] == feed.priority[5]
+    for k in (1, 5, 50, len(students) + 3):
+        assert [s['student_id'] for s in feed.top(k)] == [s['student_id'] for s in students[:k]]
+    assert AlertFeed([]).top(5) == []
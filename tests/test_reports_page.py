@@ -0,0 +1,32 @@
+"""Reports page reruns: one table page is serialized and the CSV export is never built eagerly."""
+
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from pages import reports
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+def test_rerun_serializes_one_table_page(monkeypatch):
+    exports = []
+    monkeypatch.setattr(reports, '_report_csv', lambda version: exports.append(version) or b'')
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.run()
+    at.session_state['authenticated'] = True
+    at.session_state['user'] = 'advisor1'
+    at.session_state['current_screen'] = 'reports'
+    at.run()
+    assert not at.exception
+    assert len(at.dataframe[0].value) == reports.TABLE_PAGE_SIZE
+
+    at.number_input(key='reports_table_page').set_value(2).run()
+    assert at.dataframe[0].value.iloc[0]['Student ID'] == reports._report_table(
+        reports.dataset_version())['Student ID'].iloc[reports.TABLE_PAGE_SIZE]
+
+    at.selectbox(key='reports_risk_filter').select('Medium').run()
+    assert (at.dataframe[0].value['Risk'] == 'Medium').all()
+    assert len(at.dataframe[0].value) <= reports.TABLE_PAGE_SIZE
+    assert exports == []
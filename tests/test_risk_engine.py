@@ -0,0 +1,258 @@
+"""score_frame against the per-row helpers it replaced (the reference implementation below)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dataset import DATA_PATH, normalize_dataset
+from pages.student_detail import risk_level_from_gpa as student_risk_level
+from utils.risk_engine import (
+    FLAG_NAMES, INSTITUTIONAL_GPA_CUTOFFS, PROFILE_COLUMNS, STUDENT_GPA_CUTOFFS, decode_flags, flag_counts,
+    flag_mask, gpa_risk_levels, has_flags, pack_flag_frame, score_frame,
+)
+
+
+def _seed_from_id(student_id: str) -> int:
+    """Deterministic seed derived from student_id (stable across runs)."""
+    return sum(ord(c) for c in str(student_id))
+
+
+def synthesize_student_profile(row: pd.Series) -> dict:
+    """Create synthetic attributes for a student row based on existing fields.
+
+    Returns a dict with attendance_pct, unpaid_fees, counseling_visits,
+    warnings_count, financial_aid_status, engagement_score, gpa_drop,
+    housing, study_hours.
+    """
+    sid = row.get('student_id', '')
+    gpa = row.get('gpa', None)
+    credits = row.get('credits', 0)
+
+    seed = _seed_from_id(sid)
+
+    # Attendance: base around 75, influenced by GPA and seed
+    base_att = 75
+    if gpa is not None and not pd.isna(gpa):
+        base_att += int((gpa - 2.5) * 8)
+    attendance = int(max(30, min(100, base_att + (seed % 11) - 5)))
+
+    # Unpaid fees synthetic (0..1500)
+    unpaid_fees = (seed % 6) * 300  # 0,300,600,...1500
+
+    # Counseling visits 0..4
+    counseling = seed % 5
+
+    # Warnings count 0..3, slightly higher if low GPA
+    warnings = (seed % 4) + (1 if (gpa is not None and gpa < 2.5) else 0)
+
+    # Financial aid status
+    aid_options = ['On time', 'Delayed', 'Payment Plan']
+    financial_aid = aid_options[seed % len(aid_options)]
+
+    # Engagement score 0..100 influenced by GPA
+    eng = 60
+    if gpa is not None and not pd.isna(gpa):
+        eng += int((gpa - 2.5) * 12)
+    engagement = int(max(0, min(100, eng + (seed % 21) - 10)))
+
+    # GPA drop synthetic 0.0 .. 0.8
+    gpa_drop = round((seed % 9) / 10.0, 2)
+
+    # Housing
+    housing = 'Commuter' if (seed % 2 == 0) else 'On-campus'
+
+    # Study hours per week
+    # `gpa or 2.5` raised on NaN; missing GPA falls back to 2.5 like score_frame
+    study_gpa = 2.5 if gpa is None or pd.isna(gpa) else (gpa or 2.5)
+    study_hours = int(max(0, min(80, 15 + int(study_gpa * 6) + (seed % 21) - 10)))
+
+    return {
+        'attendance_pct': attendance,
+        'unpaid_fees': unpaid_fees,
+        'counseling_visits': counseling,
+        'warnings_count': warnings,
+        'financial_aid_status': financial_aid,
+        'engagement_score': engagement,
+        'gpa_drop': gpa_drop,
+        'housing': housing,
+        'study_hours': study_hours,
+        'credits': credits,
+    }
+
+
+def compute_indicator_flags(profile: dict, gpa: float) -> dict:
+    """Compute boolean flags for each rule from the synthetic profile and GPA."""
+    flags = {}
+    flags['academic_high_risk'] = (gpa is not None and gpa < 2.0)
+    flags['attendance_alert'] = profile['attendance_pct'] < 80
+    flags['financial_risk'] = profile['unpaid_fees'] > 500
+    flags['dropout_risk'] = profile['credits'] < 30
+    flags['low_engagement'] = (profile['counseling_visits'] == 0) or (profile['engagement_score'] < 50)
+    flags['high_attrition_warnings'] = profile['warnings_count'] >= 2
+    flags['stop_out_risk'] = profile['financial_aid_status'] == 'Delayed'
+    flags['integration_risk'] = profile['housing'] == 'Commuter'
+    flags['study_hours_risk'] = profile['study_hours'] < 20
+    flags['gpa_drop_warning'] = profile['gpa_drop'] > 0.5
+    return flags
+
+
+def compute_weighted_risk(profile: dict, gpa: float) -> tuple[int, str]:
+    """Return weighted risk score (0-100) and risk label based on academic, financial, engagement."""
+    # Academic component (0..100): lower GPA and GPA drop and low study hours raise risk
+    acad_score = 0
+    if gpa is None or pd.isna(gpa):
+        acad_score = 50
+    else:
+        # map GPA 4.0 -> 0 risk, 0.0 -> 100 risk
+        acad_score = int(max(0, min(100, (3.5 - gpa) / 3.5 * 100)))
+        # increase for large GPA drop
+        acad_score = min(100, acad_score + int(profile['gpa_drop'] * 40))
+        # study hours penalty
+        if profile['study_hours'] < 20:
+            acad_score = min(100, acad_score + 10)
+
+    # Financial component (0..100): unpaid fees scaled + delayed aid penalty
+    fin_score = int(min(100, profile['unpaid_fees'] / 2000 * 100))
+    if profile['financial_aid_status'] == 'Delayed':
+        fin_score = min(100, fin_score + 25)
+
+    # Engagement component (0..100): low engagement -> higher risk
+    eng_score = int(max(0, min(100, 100 - profile['engagement_score'])))
+
+    # Weighted aggregation
+    total = int(round(0.5 * acad_score + 0.3 * fin_score + 0.2 * eng_score))
+
+    if total >= 70:
+        label = 'High'
+    elif total >= 40:
+        label = 'Medium'
+    else:
+        label = 'Low'
+
+    return total, label
+
+
+def _reference_rows(df: pd.DataFrame):
+    for _, row in df.iterrows():
+        gpa = row.get('gpa', None)
+        profile = synthesize_student_profile(row)
+        score, label = compute_weighted_risk(profile, gpa)
+        yield profile, score, label, compute_indicator_flags(profile, gpa)
+
+
+def _assert_matches_reference(df: pd.DataFrame) -> None:
+    scored = score_frame(df)
+    assert len(scored) == len(df)
+    assert list(scored.columns).count('credits') == 1
+    for pos, (profile, score, label, flags) in enumerate(_reference_rows(df)):
+        row = scored.iloc[pos]
+        for column in PROFILE_COLUMNS:
+            assert row[column] == profile[column], (pos, column)
+        assert row['risk_score'] == score, pos
+        assert row['risk_label'] == label, pos
+        assert decode_flags(row['risk_flags']) == flags, pos
+
+
+def test_bundled_dataset_matches_scalar_helpers():
+    df = normalize_dataset(pd.read_csv(DATA_PATH))
+    _assert_matches_reference(df.iloc[:500])
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_random_frames_match_scalar_helpers(seed):
+    rng = np.random.default_rng(seed)
+    n = 400
+    gpa = rng.uniform(0.0, 4.0, n).round(2)
+    # missing, zero and boundary GPAs exercise the NaN fallbacks and the `gpa or 2.5` rule
+    gpa[rng.choice(n, 40, replace=False)] = np.nan
+    gpa[:6] = [0.0, 2.0, 2.5, 3.5, np.nan, 4.0]
+    df = pd.DataFrame({
+        'student_id': [f"{'ABXZ'[i % 4]}{rng.integers(0, 10 ** 6)}" for i in range(n)],
+        'gpa': gpa,
+        'credits': rng.integers(0, 130, n),
+    })
+    _assert_matches_reference(df)
+
+
+def test_missing_gpa_and_credits_columns():
+    df = pd.DataFrame({'student_id': ['S1', 'S22', 'é9', '']})
+    _assert_matches_reference(df)
+    assert (score_frame(df)['credits'] == 0).all()
+
+
+def _random_flag_frame(n=500):
+    rng = np.random.default_rng(5)
+    flags = pd.DataFrame({name: rng.random(n) < p for name, p in zip(FLAG_NAMES, np.linspace(0.05, 0.9, len(FLAG_NAMES)))})
+    flags.iloc[0] = False
+    flags.iloc[1] = True
+    return flags
+
+
+def test_packed_flags_round_trip():
+    flags = _random_flag_frame()
+    codes = pack_flag_frame(flags)
+    assert codes.dtype == np.uint16
+    assert [decode_flags(code) for code in codes] == flags.to_dict('records')
+    assert flag_counts(codes).to_dict() == flags.sum().to_dict()
+    assert flag_counts(codes[:0]).tolist() == [0] * len(FLAG_NAMES)
+
+
+@pytest.mark.parametrize('names', [
+    ('academic_high_risk',),
+    ('financial_risk', 'stop_out_risk'),
+    ('attendance_alert', 'low_engagement', 'gpa_drop_warning'),
+])
+def test_has_flags_matches_the_flag_columns(names):
+    flags = _random_flag_frame()
+    codes = pack_flag_frame(flags)
+    assert has_flags(codes, *names).tolist() == flags[list(names)].all(axis=1).tolist()
+    assert has_flags(codes, *names, match_all=False).tolist() == flags[list(names)].any(axis=1).tolist()
+    assert flag_mask(*names) == sum(1 << FLAG_NAMES.index(name) for name in names)
+
+
+def test_scored_flags_decode_and_count():
+    scored = score_frame(normalize_dataset(pd.read_csv(DATA_PATH)).iloc[:500])
+    decoded = pd.DataFrame([decode_flags(code) for code in scored['risk_flags']])
+    assert flag_counts(scored['risk_flags']).to_dict() == decoded.sum().to_dict()
+    assert has_flags(scored['risk_flags'], 'dropout_risk').tolist() == decoded['dropout_risk'].tolist()
+
+
+def test_unknown_flag_name():
+    with pytest.raises(KeyError, match='not_a_flag'):
+        flag_mask('financial_risk', 'not_a_flag')
+    with pytest.raises(KeyError):
+        has_flags([0, 1], 'not_a_flag')
+
+
+def institutional_risk_level(prior_gpa):
+    """The institutional dashboard's original per-row risk level."""
+    if prior_gpa is None or pd.isna(prior_gpa):
+        return "Medium"
+    if prior_gpa < 2.5:
+        return "High"
+    elif prior_gpa < 3.4:
+        return "Medium"
+    return "Low"
+
+
+@pytest.mark.parametrize('cutoffs, scalar', [
+    (INSTITUTIONAL_GPA_CUTOFFS, institutional_risk_level),
+    (STUDENT_GPA_CUTOFFS, student_risk_level),
+])
+def test_gpa_risk_levels_match_the_scalar_cutoffs(cutoffs, scalar):
+    high, medium = cutoffs
+    edges = [high, medium, np.nextafter(high, -np.inf), np.nextafter(medium, -np.inf),
+             np.nextafter(high, np.inf), np.nextafter(medium, np.inf)]
+    special = [np.nan, -np.inf, np.inf, 0.0, -1.0, 4.0, 10.0]
+    gpa = np.concatenate([edges, special, np.random.default_rng(0).uniform(0, 4, 500).round(2)])
+    levels = gpa_risk_levels(gpa, cutoffs)
+    assert list(levels.categories) == ['High', 'Medium', 'Low'] and levels.ordered
+    assert levels.tolist() == [scalar(g) for g in gpa.tolist()]
+    assert levels[:2].tolist() == ['Medium', 'Low']  # a GPA on a cutoff belongs to the level above it
+
+
+def test_gpa_risk_levels_of_missing_and_non_numeric_values():
+    gpa = pd.Series([None, 'n/a', '', '2.2', 3.1, pd.NA], dtype=object)
+    assert gpa_risk_levels(gpa, STUDENT_GPA_CUTOFFS).tolist() == ['Medium', 'Medium', 'Medium', 'Medium', 'Low', 'Medium']
+    assert gpa_risk_levels(pd.Series([np.inf, -np.inf]), INSTITUTIONAL_GPA_CUTOFFS).tolist() == ['Low', 'High']
+    assert len(gpa_risk_levels(np.array([]), STUDENT_GPA_CUTOFFS)) == 0
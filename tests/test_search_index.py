@@ -0,0 +1,57 @@
+"""SearchIndex against the substring filter it replaced (str.contains(case=False) over id or name)."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.search_index import SearchIndex
+
+
+FIRST = ['Ana', 'Anabel', 'Bo', 'José', 'Zoë', 'Chen', 'Ngozi', 'Liam', 'Sana', 'Åsa']
+LAST = ['Smith', 'Smithson', 'Okafor', 'García', 'Li', 'Nguyen', "O'Brien", 'Van der Berg']
+
+
+@pytest.fixture(scope='module')
+def students():
+    rng = np.random.default_rng(11)
+    n = 2000
+    names = [f'{rng.choice(FIRST)} {rng.choice(LAST)}' for _ in range(n)]
+    names[::97] = [None] * len(names[::97])
+    return pd.DataFrame({'student_id': [f'S{i:04d}' for i in range(n)], 'name': names})
+
+
+def _baseline(df, query):
+    q = query.strip()
+    if not q:
+        return np.arange(len(df))
+    hits = np.zeros(len(df), dtype=bool)
+    for column in ('student_id', 'name'):
+        hits |= df[column].str.contains(q, case=False, regex=False, na=False).to_numpy()
+    return np.flatnonzero(hits)
+
+
+@pytest.mark.parametrize('query', [
+    # 1-3 characters: a single posting-list lookup
+    'a', 'S', '7', 'ë', "'", ' ',
+    'an', 'MI', '00', 'a ', 'é',
+    'ana', 'sMi', '012', 'n s', 'ø', 'zzz',
+    # longer: trigram intersection, then verification
+    'smith', 'SMITHSON', 'ana smith', 'S0012', 'van der', 'anabel o', 'Åsa li',
+    'garcía', 'thth', 'mithsmith', '0012ana', 'qqqqqq',
+    # empty
+    '', '   ',
+])
+def test_search_matches_the_substring_filter(students, query):
+    index = SearchIndex.from_frame(students)
+    expected = _baseline(students, query)
+    assert index.search(query).tolist() == expected.tolist()
+    assert np.flatnonzero(index.mask(query)).tolist() == expected.tolist()
+
+
+def test_missing_columns_and_empty_frames():
+    ids = pd.DataFrame({'student_id': ['S1', 'S12', 'X9']})
+    assert SearchIndex.from_frame(ids).search('s1').tolist() == [0, 1]
+    empty = SearchIndex.from_frame(ids.iloc[:0])
+    assert len(empty) == 0
+    assert empty.search('s1').tolist() == []
+    assert empty.search('').tolist() == []
@@ -0,0 +1,48 @@
+"""pages._theme.stylesheet: a <link> per rerun with static serving, a one-off head style without."""
+
+import pytest
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+SCRIPT = """
+from pages._theme import stylesheet
+stylesheet('theme')
+stylesheet('reports')
+"""
+
+
+@pytest.fixture
+def static_serving():
+    original = config.get_option('server.enableStaticServing')
+
+    def set_static_serving(enabled):
+        config.set_option('server.enableStaticServing', enabled)
+    yield set_static_serving
+    config.set_option('server.enableStaticServing', original)
+
+
+def _style_elements(at):
+    links = [m.value for m in at.markdown if '<link rel="stylesheet"' in m.value]
+    return links, list(at.get('html'))
+
+
+def test_static_serving_sends_only_link_tags(static_serving):
+    static_serving(True)
+    at = AppTest.from_string(SCRIPT).run()
+    for _ in range(2):
+        links, html = _style_elements(at)
+        assert links == ['<link rel="stylesheet" href="app/static/theme.css">',
+                         '<link rel="stylesheet" href="app/static/reports.css">']
+        assert html == []
+        at.run()
+
+
+def test_fallback_inlines_once_per_session(static_serving):
+    static_serving(False)
+    at = AppTest.from_string(SCRIPT).run()
+    links, html = _style_elements(at)
+    assert links == [] and len(html) == 2
+    assert 'report-card' in html[1].proto.body
+
+    at.run()
+    assert _style_elements(at) == ([], [])
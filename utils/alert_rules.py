@@ -0,0 +1,236 @@
+"""
+Alert Rules - declarative alert thresholds compiled to vectorized masks
+
+Each alert type (GPA, Financial, ...) has an ordered list of rules; the first
+rule that matches a student decides the severity and message, exactly like
+the if/elif chains AlertSystem.calculate_* used to hard-code (they now
+evaluate the active rules too, via first_match). A rule matches when any of its
+conditions holds. Conditions compare one column of the alert frame with a
+threshold and are evaluated as NumPy masks over every student at once.
+
+The defaults are built from the AlertSystem class constants. Institutions can
+tune them without code changes with a JSON file (ALERT_RULES_PATH, or
+data/alert_rules.json when present):
+
+    {"thresholds": {"GPA_CRITICAL": 1.8, "ATTENDANCE_WARNING": 75}}
+
+or replace the rule list entirely:
+
+    {"rules": [{"alert_type": "GPA", "severity": "critical",
+                "when": [{"field": "gpa", "op": "<", "value": 1.8}],
+                "message": "Critical GPA: {}", "value_field": "gpa"}, ...]}
+"""
+
+import hashlib
+import json
+import operator
+import os
+import threading
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+RULES_PATH = os.environ.get('ALERT_RULES_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'alert_rules.json'
+)
+
+SEVERITIES = ('critical', 'warning')
+
+# columns of the alert frame AlertSystem.evaluate_frame matches rules against
+ALERT_FIELDS = (
+    'gpa', 'credits', 'warnings', 'unpaid_fees', 'attendance',
+    'counseling_visits', 'engagement_score', 'financial_aid_status',
+)
+# compared lowercased; every other field is numeric
+TEXT_FIELDS = ('financial_aid_status',)
+
+_OPS: Dict[str, Callable[[Any, Any], Any]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+@dataclass(frozen=True)
+class Condition:
+    field: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    alert_type: str
+    severity: str
+    when: Tuple[Condition, ...]
+    message: str
+    value_field: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: Tuple[AlertRule, ...]
+
+    @property
+    def alert_types(self) -> List[str]:
+        """Alert types in first-appearance order (the column order of evaluated alerts)."""
+        return list(dict.fromkeys(rule.alert_type for rule in self.rules))
+
+    @property
+    def version(self) -> str:
+        """Content hash of the rules, for keying caches of evaluated alerts."""
+        spec = json.dumps([asdict(rule) for rule in self.rules], sort_keys=True, default=str)
+        return hashlib.sha1(spec.encode('utf-8')).hexdigest()[:12]
+
+
+def default_rules(source: Any) -> RuleSet:
+    """Rules equivalent to AlertSystem.calculate_comprehensive_risk_score, thresholds taken from source."""
+    return RuleSet((
+        AlertRule('GPA', 'critical', (Condition('gpa', '<', source.GPA_CRITICAL),), 'Critical GPA: {}', 'gpa'),
+        AlertRule('GPA', 'warning', (Condition('gpa', '<', source.GPA_WARNING),), 'Warning GPA: {}', 'gpa'),
+        AlertRule('Financial', 'critical', (
+            Condition('unpaid_fees', '>', source.UNPAID_FEES_CRITICAL),
+            Condition('financial_aid_status', '==', 'delayed'),
+        ), 'Financial risk: ${}', 'unpaid_fees'),
+        AlertRule('Financial', 'warning', (Condition('unpaid_fees', '>', source.UNPAID_FEES_WARNING),),
+                  'Outstanding: ${}', 'unpaid_fees'),
+        AlertRule('Attendance', 'warning', (Condition('attendance', '<', source.ATTENDANCE_WARNING),),
+                  'Attendance: {}%', 'attendance'),
+        AlertRule('Engagement', 'warning', (Condition('counseling_visits', '<', source.COUNSELING_VISITS_MIN),),
+                  'No counseling visits'),
+        AlertRule('Engagement', 'warning', (Condition('engagement_score', '<', source.ENGAGEMENT_LOW),),
+                  'Low engagement: {}', 'engagement_score'),
+        # calculate_credits_alert is called with is_freshman=(credits < 30), so low credits are always critical
+        AlertRule('Credits', 'critical', (Condition('credits', '<', source.CREDITS_FRESHMAN),),
+                  'Dropout risk: {} credits', 'credits'),
+        AlertRule('Warnings', 'critical', (Condition('warnings', '>=', source.WARNINGS_CRITICAL),),
+                  '{} warnings', 'warnings'),
+        AlertRule('Warnings', 'warning', (Condition('warnings', '>', 0),), '{} warning(s)', 'warnings'),
+    ))
+
+
+def _number(value: Any, what: str) -> float:
+    """value as a threshold: numbers pass through, numeric strings are coerced, anything else is rejected."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise ValueError(f"{what} must be a number, got {value!r}")
+
+
+def _condition_from_dict(spec: Dict, alert_type: str) -> Condition:
+    field, value = spec['field'], spec['value']
+    if field in TEXT_FIELDS:
+        if not isinstance(value, str):
+            raise ValueError(f"{field} value in {alert_type} rule must be a string, got {value!r}")
+        value = value.lower()
+    elif field in ALERT_FIELDS:
+        value = _number(value, f"{field} value in {alert_type} rule")
+    return Condition(field, spec['op'], value)
+
+
+def _rule_from_dict(spec: Dict) -> AlertRule:
+    rule = AlertRule(
+        alert_type=spec['alert_type'],
+        severity=spec['severity'],
+        when=tuple(_condition_from_dict(c, spec['alert_type']) for c in spec['when']),
+        message=spec['message'],
+        value_field=spec.get('value_field'),
+    )
+    validate_rule(rule)
+    return rule
+
+
+def validate_rule(rule: AlertRule) -> None:
+    if rule.severity not in SEVERITIES:
+        raise ValueError(f"Unknown severity {rule.severity!r} in {rule.alert_type} rule")
+    if not rule.when:
+        raise ValueError(f"{rule.alert_type} rule has no conditions")
+    for cond in rule.when:
+        if cond.field not in ALERT_FIELDS:
+            raise ValueError(f"Unknown field {cond.field!r} in {rule.alert_type} rule")
+        if cond.op not in _OPS:
+            raise ValueError(f"Unknown operator {cond.op!r} in {rule.alert_type} rule")
+    if rule.value_field is not None and rule.value_field not in ALERT_FIELDS:
+        raise ValueError(f"Unknown value_field {rule.value_field!r} in {rule.alert_type} rule")
+
+
+def load_rules(source: Any, path: Optional[str] = None) -> RuleSet:
+    """Default rules for source, overridden by the JSON file at path (if it exists)."""
+    path = path or RULES_PATH
+    if not os.path.exists(path):
+        return default_rules(source)
+    with open(path, 'r', encoding='utf-8') as fh:
+        spec = json.load(fh)
+    if 'rules' in spec:
+        try:
+            return RuleSet(tuple(_rule_from_dict(r) for r in spec['rules']))
+        except ValueError as exc:
+            raise ValueError(f"{exc} ({path})") from None
+
+    thresholds = SimpleNamespace(**{name: getattr(source, name) for name in dir(source) if name.isupper()})
+    for name, value in spec.get('thresholds', {}).items():
+        if not hasattr(thresholds, name):
+            raise ValueError(f"Unknown threshold {name!r} in {path}")
+        setattr(thresholds, name, _number(value, f"Threshold {name!r} in {path}"))
+    return default_rules(thresholds)
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[Tuple[int, str, Optional[int]], RuleSet] = {}
+
+
+def active_rules(source: Any, path: Optional[str] = None) -> RuleSet:
+    """load_rules, cached per process until the override file changes."""
+    path = path or RULES_PATH
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    key = (id(source), path, mtime)
+    with _cache_lock:
+        rules = _cache.get(key)
+        if rules is None:
+            rules = _cache[key] = load_rules(source, path)
+        return rules
+
+
+def first_match(rules: RuleSet, alert_type: str, values: Dict[str, Any]) -> Optional[AlertRule]:
+    """Scalar match_rules for one student: the first alert_type rule that fires for values.
+
+    Conditions on fields absent from values never hold.
+    """
+    for rule in rules.rules:
+        if rule.alert_type != alert_type:
+            continue
+        if any(cond.field in values and bool(_OPS[cond.op](values[cond.field], cond.value)) for cond in rule.when):
+            return rule
+    return None
+
+
+def match_rules(rules: RuleSet, fields: Dict[str, np.ndarray], n: int) -> List[Tuple[AlertRule, np.ndarray]]:
+    """(rule, mask of the students it fires for), evaluated over whole columns.
+
+    Earlier rules of the same alert type win, like an if/elif chain.
+    """
+    taken = {alert_type: np.zeros(n, dtype=bool) for alert_type in rules.alert_types}
+    matches = []
+    for rule in rules.rules:
+        mask = np.zeros(n, dtype=bool)
+        for cond in rule.when:
+            if cond.field not in fields:
+                raise KeyError(f"Unknown alert field {cond.field!r}")
+            mask |= np.asarray(_OPS[cond.op](fields[cond.field], cond.value), dtype=bool)
+        mask &= ~taken[rule.alert_type]
+        taken[rule.alert_type] |= mask
+        matches.append((rule, mask))
+    return matches
@@ -0,0 +1,335 @@
+"""
+Alert Store - persistent alerts, notifications and interventions in data/alerts.db
+
+Each evaluation is written in a single transaction. Rows are de-duplicated on
+(student_id, alert_type, severity, message), so the log only grows when an
+alert actually changes.
+
+In-app notifications, acknowledgements and interventions live here too, so
+they survive refreshes and are shared by every advisor. All access goes
+through one connection per process (serialized by a lock, WAL mode), and
+list queries are paged in SQL.
+"""
+
+import hashlib
+import itertools
+import os
+import sqlite3
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+
+DB_PATH = os.environ.get('ALERTS_DB_PATH') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'alerts.db'
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    severity TEXT,
+    message TEXT,
+    source TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS interventions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    alert_type TEXT,
+    assigned_to TEXT,
+    priority TEXT,
+    notes TEXT,
+    status TEXT,
+    created_at TEXT NOT NULL,
+    due_date TEXT
+);
+CREATE TABLE IF NOT EXISTS acknowledgements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    acknowledged_by TEXT,
+    acknowledged_at TEXT NOT NULL,
+    note TEXT
+);
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id TEXT NOT NULL,
+    subject TEXT,
+    message TEXT,
+    advisor TEXT,
+    status TEXT NOT NULL DEFAULT 'open',
+    severity TEXT,
+    dedup_key TEXT,
+    created_at TEXT NOT NULL,
+    acknowledged_at TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_notifications_student_status ON notifications (student_id, status);
+CREATE INDEX IF NOT EXISTS ix_notifications_status ON notifications (status, id);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_notifications_dedup ON notifications (dedup_key) WHERE dedup_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_interventions_student_status ON interventions (student_id, status);
+"""
+
+# Drop repeats left by the old per-rerun logging before the unique index is created
+_DEDUP = """
+DELETE FROM alert_logs WHERE id NOT IN (
+    SELECT MIN(id) FROM alert_logs
+    GROUP BY student_id, alert_type, IFNULL(severity, ''), IFNULL(message, '')
+)
+"""
+
+# Databases created before notifications had a severity column: add it, filled in from the subject
+_ADD_SEVERITY = """
+ALTER TABLE notifications ADD COLUMN severity TEXT;
+UPDATE notifications
+SET severity = CASE WHEN upper(IFNULL(subject, '')) LIKE '%CRITICAL%' THEN 'critical' ELSE 'warning' END;
+"""
+
+_SEVERITY_INDEX = """
+CREATE INDEX IF NOT EXISTS ix_notifications_status_severity ON notifications (status, severity, id)
+"""
+
+_UNIQUE_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS ux_alert_logs_content
+ON alert_logs (student_id, alert_type, IFNULL(severity, ''), IFNULL(message, ''))
+"""
+
+_INSERT = """
+INSERT OR IGNORE INTO alert_logs (student_id, alert_type, severity, message, source, created_at)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_NOTIFICATION = """
+INSERT OR IGNORE INTO notifications (student_id, subject, message, advisor, status, severity, dedup_key, created_at)
+VALUES (?, ?, ?, ?, 'open', ?, ?, ?)
+"""
+
+_INSERT_INTERVENTION = """
+INSERT INTO interventions (student_id, alert_type, assigned_to, priority, notes, status, created_at, due_date)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+OPEN, ACKNOWLEDGED = 'open', 'acknowledged'
+
+_lock = threading.RLock()
+_connections: Dict[str, sqlite3.Connection] = {}
+_initialized = set()
+_last_digest: Dict[str, str] = {}
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _connect(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """The process-wide connection for db_path; callers must hold _lock."""
+    path = db_path or DB_PATH
+    conn = _connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _connections[path] = conn
+    return conn
+
+
+def severity_of(subject: Optional[str]) -> str:
+    """Severity of a notification recorded without one: critical if its subject says so."""
+    return 'critical' if 'CRITICAL' in (subject or '').upper() else 'warning'
+
+
+def init_db(db_path: Optional[str] = None) -> None:
+    """Create or migrate tables, collapse duplicate log rows and add the indexes (once per process)."""
+    path = db_path or DB_PATH
+    with _lock:
+        if path in _initialized:
+            return
+        conn = _connect(path)
+        with conn:
+            conn.executescript(_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(notifications)")}
+            if 'severity' not in columns:
+                conn.executescript(_ADD_SEVERITY)
+            conn.execute(_SEVERITY_INDEX)
+            conn.execute(_DEDUP)
+            conn.execute(_UNIQUE_INDEX)
+        _initialized.add(path)
+
+
+@contextmanager
+def _transaction(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    init_db(db_path)
+    with _lock:
+        conn = _connect(db_path)
+        with conn:
+            yield conn
+
+
+def _fetch(sql: str, params: Sequence = (), db_path: Optional[str] = None) -> List[Dict]:
+    init_db(db_path)
+    with _lock:
+        return [dict(row) for row in _connect(db_path).execute(sql, params).fetchall()]
+
+
+def log_alerts(rows: Iterable[Tuple[str, str, str, str]], source: str = 'rule_engine',
+               db_path: Optional[str] = None) -> int:
+    """Write (student_id, alert_type, severity, message) rows in one transaction.
+
+    Returns the number of rows that were new to the log.
+    """
+    created_at = datetime.now().isoformat()
+    with _transaction(db_path) as conn:
+        before = conn.total_changes
+        conn.executemany(_INSERT, ((sid, atype, sev, msg, source, created_at) for sid, atype, sev, msg in rows))
+        return conn.total_changes - before
+
+
+def log_alert_frame(alerts: pd.DataFrame, source: str = 'rule_engine', db_path: Optional[str] = None) -> int:
+    """Log a long-format alerts table from AlertSystem.evaluate_frame.
+
+    Skips the database entirely when the table is identical to the last one
+    written from this process, which is the common case across reruns.
+    """
+    columns = ['student_id', 'type', 'severity', 'message']
+    digest = hashlib.sha1(pd.util.hash_pandas_object(alerts[columns], index=False).to_numpy().tobytes()).hexdigest()
+    key = db_path or DB_PATH
+    if _last_digest.get(key) == digest:
+        return 0
+    rows = zip(*(alerts[c].astype(object).tolist() for c in columns))
+    added = log_alerts(rows, source=source, db_path=db_path)
+    _last_digest[key] = digest
+    return added
+
+
+def log_alert(student_id: str, alert_type: str, severity: str, message: str,
+              source: str = 'rule_engine', db_path: Optional[str] = None) -> int:
+    """Log a single alert (ignored if an identical one is already stored)."""
+    return log_alerts([(student_id, alert_type, severity, message)], source=source, db_path=db_path)
+
+
+# -- notifications ---------------------------------------------------------
+
+def add_notifications(rows: Iterable[Tuple[str, str, str]], advisor: str = 'Advisor',
+                      dedup_keys: Optional[Iterable[Optional[str]]] = None,
+                      severities: Optional[Iterable[Optional[str]]] = None,
+                      db_path: Optional[str] = None) -> int:
+    """Insert (student_id, subject, message) notifications in one transaction.
+
+    Rows whose dedup key already exists (open or acknowledged) are skipped.
+    A missing severity is taken from the subject (severity_of).
+    Returns the number of notifications created.
+    """
+    created_at = _now()
+    keys = dedup_keys if dedup_keys is not None else itertools.repeat(None)
+    levels = severities if severities is not None else itertools.repeat(None)
+    with _transaction(db_path) as conn:
+        before = conn.total_changes
+        conn.executemany(_INSERT_NOTIFICATION, (
+            (sid, subject, message, advisor, severity or severity_of(subject), key, created_at)
+            for (sid, subject, message), key, severity in zip(rows, keys, levels)
+        ))
+        return conn.total_changes - before
+
+
+def _notification_filter(status: Optional[str], student_ids: Optional[Iterable[str]],
+                         subject_contains: Optional[str], critical: Optional[bool]) -> Tuple[str, list]:
+    """WHERE clause for notification queries; student_ids and subject_contains are OR-ed (search)."""
+    clauses, params = [], []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    search = []
+    if student_ids is not None:
+        search.append("student_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(student_ids)))
+    if subject_contains:
+        search.append("instr(lower(IFNULL(subject, '')), ?) > 0")
+        params.append(subject_contains.lower())
+    if search:
+        clauses.append("(" + " OR ".join(search) + ")")
+    if critical is not None:
+        clauses.append("severity = ?")
+        params.append('critical' if critical else 'warning')
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def count_notifications(status: Optional[str] = OPEN, student_ids: Optional[Iterable[str]] = None,
+                        subject_contains: Optional[str] = None, critical: Optional[bool] = None,
+                        db_path: Optional[str] = None) -> int:
+    where, params = _notification_filter(status, student_ids, subject_contains, critical)
+    return _fetch("SELECT COUNT(*) AS n FROM notifications" + where, params, db_path)[0]['n']
+
+
+def list_notifications(status: Optional[str] = OPEN, student_ids: Optional[Iterable[str]] = None,
+                       subject_contains: Optional[str] = None, critical: Optional[bool] = None,
+                       limit: int = 50, offset: int = 0, db_path: Optional[str] = None) -> List[Dict]:
+    """One page of notifications (oldest first) matching the filters."""
+    where, params = _notification_filter(status, student_ids, subject_contains, critical)
+    return _fetch(
+        "SELECT id, student_id, subject, message, advisor, status, severity, created_at, acknowledged_at"
+        " FROM notifications" + where + " ORDER BY id LIMIT ? OFFSET ?",
+        params + [int(limit), int(offset)], db_path,
+    )
+
+
+def notifications_for_student(student_id: str, status: Optional[str] = OPEN,
+                              db_path: Optional[str] = None) -> List[Dict]:
+    return list_notifications(status=status, student_ids=[student_id], limit=-1, db_path=db_path)
+
+
+def acknowledge_notification(notification_id: int, acknowledged_by: str = 'Advisor',
+                             db_path: Optional[str] = None) -> bool:
+    """Mark an open notification acknowledged, recording the acknowledgement and an intervention."""
+    now = _now()
+    with _transaction(db_path) as conn:
+        row = conn.execute(
+            "SELECT student_id, subject, message, advisor FROM notifications WHERE id = ? AND status = ?",
+            (notification_id, OPEN),
+        ).fetchone()
+        if row is None:
+            return False
+        conn.execute("UPDATE notifications SET status = ?, acknowledged_at = ? WHERE id = ?",
+                     (ACKNOWLEDGED, now, notification_id))
+        conn.execute(
+            "INSERT INTO acknowledgements (student_id, alert_type, acknowledged_by, acknowledged_at, note)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (row['student_id'], row['subject'] or '', acknowledged_by, now, row['message']),
+        )
+        conn.execute(_INSERT_INTERVENTION, (
+            row['student_id'], 'Notification Acknowledged', row['advisor'] or acknowledged_by,
+            None, row['message'], 'completed', now, None,
+        ))
+        return True
+
+
+# -- interventions ---------------------------------------------------------
+
+def add_intervention(student_id: str, intervention_type: str, advisor: str, notes: str = '',
+                     status: str = 'open', priority: Optional[str] = None, due_date: Optional[str] = None,
+                     db_path: Optional[str] = None) -> int:
+    """Record an intervention; returns its id."""
+    with _transaction(db_path) as conn:
+        cur = conn.execute(_INSERT_INTERVENTION, (
+            student_id, intervention_type, advisor, priority, notes, status, _now(), due_date,
+        ))
+        return cur.lastrowid
+
+
+def list_interventions(student_id: str, status: Optional[str] = None, limit: int = 50, offset: int = 0,
+                       db_path: Optional[str] = None) -> List[Dict]:
+    """One page of a student's interventions, newest first."""
+    where, params = "WHERE student_id = ?", [student_id]
+    if status is not None:
+        where += " AND status = ?"
+        params.append(status)
+    return _fetch(
+        "SELECT id, student_id, alert_type, assigned_to, priority, notes, status, created_at, due_date"
+        f" FROM interventions {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+        params + [int(limit), int(offset)], db_path,
+    )
@@ -0,0 +1,436 @@
+"""
+Dataset Service - one shared, process-wide copy of the student dataset
+
+The CSV is parsed and normalized once per process (st.cache_resource) and
+every page receives a shallow, copy-on-write view of that single frame, so
+sessions never pickle or duplicate it. The enriched frame is stored with
+compact dtypes (categoricals, downcast numbers; see frame_dtypes).
+
+The normalized + enriched frame is also persisted next to the CSV as an
+Arrow IPC file keyed on the source's mtime, size and SHA-256; later
+processes memory-map it instead of re-parsing and re-scoring. When the CSV
+changes, only added or changed rows (by student_id and row hash) are
+re-scored and patched into the cached frame and the alert store. Without a
+usable cache the CSV is streamed into it in bounded-memory chunks.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import streamlit as st
+
+from . import alert_store
+from .alert_logic import AlertSystem, build_alert_frame
+from .frame_dtypes import CompactDtypes, compact_frame
+from .kpi_cube import KpiCube, build_kpi_cube
+from .parallel_scoring import score_chunks, score_frame_parallel
+from .ranking import top_k
+from .risk_engine import ENGINE_VERSION, score_frame
+from .search_index import SearchIndex
+
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # pandas 3 always copies on write; on 2.x views handed to pages must not write through
+    pd.set_option('mode.copy_on_write', True)
+
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'student_performance_dataset.csv'
+)
+CACHE_PATH = os.path.splitext(DATA_PATH)[0] + '.enriched.arrow'
+
+# Per-row content hash of the source columns, stored alongside the cached frame
+ROW_HASH_COLUMN = '__row_hash'
+
+# read_csv dtypes shared by every CSV reader here: IDs are text even when they look numeric,
+# so streamed chunks, full reads and row hashes always agree on them
+CSV_DTYPES = {'student_id': str}
+
+# Rows per chunk when a cold build streams the CSV into the cache
+STREAM_CHUNK_ROWS = 100_000
+
+
+def normalize_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """Ensure key columns exist even if source CSV uses alternate names."""
+    # shallow: added columns never reach the caller's frame, and existing data is shared copy-on-write
+    df = df.copy(deep=False)
+    if 'gpa' not in df.columns:
+        if 'prior_gpa' in df.columns:
+            df['gpa'] = df['prior_gpa']
+        else:
+            df['gpa'] = None
+    if 'credits' not in df.columns and 'credits_completed' in df.columns:
+        df['credits'] = df['credits_completed']
+    return df
+
+
+def _mock_dataset() -> pd.DataFrame:
+    """Small built-in dataset used when the CSV is missing or empty."""
+    return pd.DataFrame({
+        'student_id': ['S001', 'S002', 'S003', 'S004', 'S005', 'S006', 'S007', 'S008'],
+        'name': ['John Smith', 'Emily Davis', 'Michael Chen', 'Sarah Johnson', 'David Martinez', 'Jessica Williams', 'Alex Brown', 'Lisa Anderson'],
+        'major': ['Engineering', 'Business', 'Computer Science', 'Arts', 'Engineering', 'Business', 'Computer Science', 'Arts'],
+        'program': ['BSc', 'MSc', 'BSc', 'Diploma', 'BSc', 'MSc', 'BSc', 'Diploma'],
+        'prior_gpa': [2.1, 2.4, 2.8, 3.0, 3.2, 3.5, 2.9, 3.1],
+        'year': ['Junior', 'Sophomore', 'Senior', 'Junior', 'Senior', 'Junior', 'Sophomore', 'Senior'],
+        'graduation_year': [2025, 2026, 2024, 2025, 2024, 2025, 2026, 2024],
+        'credits': [78, 65, 110, 95, 120, 88, 72, 105],
+        'student_performance': ['Pass', 'Fail', 'Pass', 'Pass', 'Pass', 'Pass', 'Fail', 'Pass']
+    })
+
+
+class DatasetFrames(NamedTuple):
+    dataset: pd.DataFrame
+    enriched: pd.DataFrame
+    version: str
+
+
+class _CachedFrame(NamedTuple):
+    enriched: pd.DataFrame
+    source_columns: List[str]
+    row_hash: np.ndarray
+    meta: Dict[str, str]
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_fingerprint(path: str) -> Dict[str, str]:
+    stat = os.stat(path)
+    return {'source_mtime_ns': str(stat.st_mtime_ns), 'source_size': str(stat.st_size)}
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _open_cache(cache_path: str) -> Optional[_CachedFrame]:
+    """Memory-map the cached enriched frame, whatever source version it was built from."""
+    if not os.path.exists(cache_path):
+        return None
+    reader = ipc.open_file(pa.memory_map(cache_path, 'r'))
+    meta = {k.decode(): v.decode() for k, v in (reader.schema.metadata or {}).items()}
+    if meta.get('engine_version') != str(ENGINE_VERSION):
+        return None
+    table = reader.read_all()
+    row_hash = table.column(ROW_HASH_COLUMN).to_numpy()
+    enriched = table.drop_columns([ROW_HASH_COLUMN]).to_pandas()
+    return _CachedFrame(enriched, json.loads(meta['source_columns']), row_hash, meta)
+
+
+def _is_fresh(cached: _CachedFrame, source_path: str) -> bool:
+    fingerprint = _source_fingerprint(source_path)
+    if all(cached.meta.get(k) == v for k, v in fingerprint.items()):
+        return True
+    # touched or copied: only trust the cache if the content is unchanged
+    return (cached.meta.get('source_size') == fingerprint['source_size']
+            and cached.meta.get('source_sha256') == _file_sha256(source_path))
+
+
+def _cache_table(enriched: pd.DataFrame, row_hash: np.ndarray) -> pa.Table:
+    table = pa.Table.from_pandas(enriched, preserve_index=False)
+    return table.append_column(ROW_HASH_COLUMN, pa.array(row_hash, type=pa.uint64()))
+
+
+def _cache_metadata(schema: pa.Schema, source_path: str, source_columns: List[str], sha256: str) -> Dict[bytes, bytes]:
+    meta = dict(schema.metadata or {})
+    meta.update({k.encode(): v.encode() for k, v in {
+        **_source_fingerprint(source_path),
+        'source_sha256': sha256,
+        'source_columns': json.dumps(source_columns),
+        'engine_version': str(ENGINE_VERSION),
+    }.items()})
+    return meta
+
+
+def _write_cache(enriched: pd.DataFrame, source_columns: List[str], row_hash: np.ndarray,
+                 source_path: str, cache_path: str) -> str:
+    """Atomically write the enriched frame as an uncompressed (mmap-able) Arrow IPC file.
+
+    Returns the SHA-256 of the source it was built from.
+    """
+    sha256 = _file_sha256(source_path)
+    table = _cache_table(enriched, row_hash)
+    table = table.replace_schema_metadata(_cache_metadata(table.schema, source_path, source_columns, sha256))
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+    return sha256
+
+
+def _rescore_incremental(df: pd.DataFrame, row_hash: np.ndarray,
+                         previous: Optional[_CachedFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Score df reusing unchanged rows of the previous enriched frame.
+
+    Returns (enriched, rescored) where rescored holds only the added or
+    changed rows. Falls back to a full re-score when the previous frame
+    cannot be matched (different columns, duplicate student_ids, ...).
+    """
+    if (previous is None or previous.source_columns != list(df.columns)
+            or 'student_id' not in df.columns
+            or not df['student_id'].is_unique
+            or not previous.enriched['student_id'].is_unique):
+        enriched = score_frame_parallel(df)
+        return enriched, enriched
+
+    old_pos = pd.Index(previous.enriched['student_id']).get_indexer(df['student_id'])
+    matched = old_pos >= 0
+    unchanged = np.zeros(len(df), dtype=bool)
+    unchanged[matched] = previous.row_hash[old_pos[matched]] == row_hash[matched]
+    if unchanged.all() and len(df) == len(previous.enriched):
+        if np.array_equal(old_pos, np.arange(len(df))):
+            return previous.enriched, previous.enriched.iloc[:0]
+        # same rows, new order: follow the CSV so the stored row hashes line up with the frame
+        return previous.enriched.iloc[old_pos].reset_index(drop=True), previous.enriched.iloc[:0]
+
+    new_pos = np.flatnonzero(~unchanged)
+    rescored = score_frame_parallel(df.iloc[new_pos])
+    kept = previous.enriched.iloc[old_pos[unchanged]]
+    kept.index = np.flatnonzero(unchanged)
+    rescored.index = new_pos
+    enriched = pd.concat([kept, rescored]).sort_index().reset_index(drop=True)
+    return enriched, rescored.reset_index(drop=True)
+
+
+def _patch_alert_store(rescored: pd.DataFrame) -> None:
+    """Log alerts for re-scored rows only; unchanged students keep their stored alerts."""
+    if len(rescored) == 0:
+        return
+    try:
+        alerts, _ = AlertSystem.evaluate_frame(build_alert_frame(rescored))
+        alert_store.log_alerts(
+            zip(*(alerts[c].astype(object).tolist() for c in ['student_id', 'type', 'severity', 'message'])),
+            source='rule_engine',
+        )
+    except Exception:
+        pass
+
+
+def _read_chunks(source_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Normalized CSV chunks, parsed like _build_frames' full read (CSV_DTYPES)."""
+    with pd.read_csv(source_path, chunksize=chunk_rows, dtype=CSV_DTYPES) as reader:
+        for chunk in reader:
+            yield normalize_dataset(chunk)
+
+
+def _stream_build(source_path: str, cache_path: str,
+                  chunk_rows: int = STREAM_CHUNK_ROWS) -> Optional[DatasetFrames]:
+    """Cold build: stream the CSV through normalize -> score -> alert store -> Arrow cache.
+
+    Each scored chunk is spooled to disk at its own dtypes; the dtypes
+    compact_frame would choose for the whole frame are only known after the
+    last chunk, so the spool is then rewritten batch by batch into the cache.
+    Peak memory is a chunk or two plus the final frame, memory-mapped back
+    from the cache. Returns None when the CSV has no rows.
+    """
+    chunks = _read_chunks(source_path, chunk_rows)
+    first = next(chunks, None)
+    if first is None or len(first) == 0:
+        return None
+    source_columns = list(first.columns)
+    sha256 = _file_sha256(source_path)
+    plan = CompactDtypes()
+    spool_path = f"{cache_path}.{os.getpid()}.spool"
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with pa.OSFile(spool_path, 'wb') as sink:
+            schema, writer = None, None
+            for scored in score_chunks(itertools.chain([first], chunks)):
+                row_hash = _row_hashes(scored[source_columns])
+                _patch_alert_store(scored)
+                plan.observe(scored)
+                # later chunks are cast to the first chunk's schema (or fail, falling back to the in-memory build)
+                table = pa.Table.from_pandas(scored, schema=schema, preserve_index=False)
+                schema = table.schema
+                table = table.append_column(ROW_HASH_COLUMN, pa.array(row_hash, type=pa.uint64()))
+                if writer is None:
+                    writer = ipc.new_stream(sink, table.schema)
+                writer.write_table(table)
+            writer.close()
+
+        dtypes = plan.dtypes()
+        with pa.memory_map(spool_path, 'r') as source, pa.OSFile(tmp_path, 'wb') as sink:
+            writer = None
+            for batch in ipc.open_stream(source):
+                chunk = batch.to_pandas()
+                table = _cache_table(chunk.drop(columns=ROW_HASH_COLUMN).astype(dtypes),
+                                     chunk[ROW_HASH_COLUMN].to_numpy())
+                if writer is None:
+                    meta = _cache_metadata(table.schema, source_path, source_columns, sha256)
+                    writer = ipc.new_file(sink, table.schema.with_metadata(meta))
+                writer.write_table(table.replace_schema_metadata(meta))
+            writer.close()
+        os.replace(tmp_path, cache_path)
+    finally:
+        for path in (spool_path, tmp_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    cached = _open_cache(cache_path)
+    return DatasetFrames(cached.enriched[source_columns], cached.enriched, f"{sha256[:16]}-v{ENGINE_VERSION}")
+
+
+def _build_frames(source_path: str = DATA_PATH, cache_path: str = CACHE_PATH) -> DatasetFrames:
+    """Load frames from the Arrow cache, incrementally re-scoring when the CSV changed."""
+    try:
+        previous = _open_cache(cache_path)
+    except Exception:
+        previous = None
+
+    try:
+        if previous is not None and _is_fresh(previous, source_path):
+            enriched = previous.enriched
+            return DatasetFrames(enriched[previous.source_columns], enriched,
+                                 f"{previous.meta['source_sha256'][:16]}-v{ENGINE_VERSION}")
+    except OSError:
+        pass
+
+    if previous is None:
+        try:
+            frames = _stream_build(source_path, cache_path)
+        except Exception:
+            # unreadable or irregular CSV, or no writable cache directory: build in memory below
+            frames = None
+        if frames is not None:
+            return frames
+
+    try:
+        df = pd.read_csv(source_path, dtype=CSV_DTYPES)
+        if len(df) == 0:
+            raise ValueError("CSV is empty")
+    except Exception:
+        df = normalize_dataset(_mock_dataset())
+        enriched = compact_frame(score_frame(df))
+        return DatasetFrames(enriched[list(df.columns)], enriched, f"mock-v{ENGINE_VERSION}")
+
+    df = normalize_dataset(df)
+    row_hash = _row_hashes(df)
+    enriched, rescored = _rescore_incremental(df, row_hash, previous)
+    enriched = compact_frame(enriched)
+    _patch_alert_store(rescored)
+    try:
+        sha256 = _write_cache(enriched, list(df.columns), row_hash, source_path, cache_path)
+    except Exception:
+        # read-only checkout or full disk: serve from memory this time
+        sha256 = _file_sha256(source_path)
+    return DatasetFrames(enriched[list(df.columns)], enriched, f"{sha256[:16]}-v{ENGINE_VERSION}")
+
+
+def _source_key() -> Tuple[int, int]:
+    try:
+        stat = os.stat(DATA_PATH)
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _shared_frames(source_key: Tuple[int, int]) -> DatasetFrames:
+    """Frames shared by every session in this process, rebuilt when the CSV changes."""
+    return _build_frames(DATA_PATH, CACHE_PATH)
+
+
+def _current_frames() -> DatasetFrames:
+    return _shared_frames(_source_key())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _student_positions(version: str) -> Dict[str, int]:
+    """student_id -> row position in the enriched frame (first occurrence wins)."""
+    ids = _current_frames().enriched['student_id'].tolist()
+    return {sid: pos for pos, sid in reversed(list(enumerate(ids)))}
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _search_index(version: str) -> SearchIndex:
+    return SearchIndex.from_frame(_current_frames().enriched)
+
+
+def student_search_index() -> SearchIndex:
+    """ID/name search index over the enriched frame's row positions, built once per version."""
+    return _search_index(dataset_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _kpi_cube(version: str) -> KpiCube:
+    # source columns only (the enriched frame's synthetic credits must not count), plus the binned levels
+    frames = _current_frames()
+    return build_kpi_cube(frames.dataset.assign(institutional_risk_level=frames.enriched['institutional_risk_level']))
+
+
+def kpi_cube() -> KpiCube:
+    """Program x risk level x graduation year aggregates of the dataset, built once per version."""
+    return _kpi_cube(dataset_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _top_risk(version: str, k: int, exclude_label: Optional[str]) -> np.ndarray:
+    enriched = _current_frames().enriched
+    mask = (enriched['risk_label'] != exclude_label).to_numpy() if exclude_label is not None else None
+    return top_k(enriched['risk_score'].to_numpy(), k, mask=mask)
+
+
+def top_risk_positions(k: int, exclude_label: Optional[str] = None) -> np.ndarray:
+    """Enriched-frame positions of the k highest risk_score students (ties in frame order).
+
+    exclude_label skips students with that risk_label. Selected in O(n), cached per version.
+    """
+    return _top_risk(dataset_version(), k, exclude_label)
+
+
+def dataset_version() -> str:
+    """Stable identifier of the current dataset content and scoring engine."""
+    return _current_frames().version
+
+
+def load_dataset() -> pd.DataFrame:
+    """Normalized student dataset as a read-only (copy-on-write) view of the shared frame."""
+    return _current_frames().dataset.copy(deep=False)
+
+
+def load_enriched_dataset() -> pd.DataFrame:
+    """Dataset with synthetic attributes, risk score/label and flags; read-only view."""
+    return _current_frames().enriched.copy(deep=False)
+
+
+def get_student_record(student_id: str) -> Optional[pd.Series]:
+    """O(1) lookup of one student's enriched row via a per-version id index."""
+    frames = _current_frames()
+    pos = _student_positions(frames.version).get(student_id)
+    if pos is None:
+        return None
+    return frames.enriched.iloc[pos]
+
+
+def student_positions(student_ids: Iterable[str]) -> np.ndarray:
+    """Enriched-frame row positions of student_ids (-1 for unknown IDs), via the per-version id index."""
+    positions = _student_positions(dataset_version())
+    return np.fromiter((positions.get(sid, -1) for sid in student_ids), dtype=np.int64)
+
+
+def get_student_names(student_ids: Iterable[str]) -> List[str]:
+    """Display names for student_ids; the ID itself when the student or a name is missing."""
+    ids = list(student_ids)
+    frames = _current_frames()
+    if 'name' not in frames.enriched.columns:
+        return ids
+    positions = _student_positions(frames.version)
+    names = frames.enriched['name'].to_numpy(dtype=object)
+    out = []
+    for sid in ids:
+        pos = positions.get(sid)
+        name = names[pos] if pos is not None else None
+        out.append(sid if name is None or name != name else name)
+    return out
@@ -0,0 +1,146 @@
+"""
+Frame Dtypes - compact memory layout for the shared student frames
+
+The enriched frame is built once per dataset version and shared by every
+session, so its layout is the per-process footprint of the app. Low
+cardinality text columns become categoricals (with fixed categories where
+the values are known), signed integer columns are downcast to the smallest
+type that holds them, and float columns to float32 when that is lossless.
+
+CompactDtypes makes the same choices for a frame that is only ever seen one
+chunk at a time (streamed ingestion), from statistics gathered per chunk.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk_engine import AID_OPTIONS, RISK_LEVELS
+
+
+# column -> categories (None: taken from the data)
+CATEGORY_SCHEMA: Dict[str, Optional[List[str]]] = {
+    'risk_label': RISK_LEVELS,
+    'financial_aid_status': AID_OPTIONS,
+    'housing': ['Commuter', 'On-campus'],
+    'gender': None,
+    'program': None,
+    'student_performance': None,
+}
+
+
+def _to_category(col: pd.Series, categories: Optional[List[str]]) -> pd.Series:
+    if categories is not None:
+        values = set(col.dropna().unique().tolist())
+        if values <= set(categories):
+            return col.astype(pd.CategoricalDtype(categories))
+    # unknown values must never turn into NaN: fall back to data-driven categories
+    return col.astype('category')
+
+
+def _downcast_float(col: pd.Series) -> pd.Series:
+    values = col.to_numpy()
+    narrow = values.astype(np.float32)
+    if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+        return pd.Series(narrow, index=col.index, name=col.name)
+    return col
+
+
+def compact_frame(df: pd.DataFrame, categories: Optional[Dict[str, Optional[List[str]]]] = None) -> pd.DataFrame:
+    """df with the compact dtypes above; values are unchanged."""
+    categories = CATEGORY_SCHEMA if categories is None else categories
+    columns = {}
+    for name in df.columns:
+        col = df[name]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            columns[name] = col
+        elif name in categories:
+            columns[name] = _to_category(col, categories[name])
+        elif pd.api.types.is_signed_integer_dtype(col.dtype):
+            # unsigned columns (the risk_flags bitmask) already have their intended width
+            columns[name] = pd.to_numeric(col, downcast='integer')
+        elif pd.api.types.is_float_dtype(col.dtype) and col.dtype != np.float32:
+            columns[name] = _downcast_float(col)
+        else:
+            columns[name] = col
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _integer_dtype(low: int, high: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _float32_lossless(col: pd.Series) -> bool:
+    values = col.to_numpy(dtype=np.float64)
+    return bool(np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True))
+
+
+class CompactDtypes:
+    """The dtypes compact_frame would give the concatenation of a stream of chunks.
+
+    observe() every chunk in turn, then dtypes() maps each column to its
+    categorical (categories gathered over all chunks), smallest signed
+    integer or float32/float64 dtype. Other columns keep their first dtype.
+    """
+
+    def __init__(self, categories: Optional[Dict[str, Optional[List[str]]]] = None):
+        self.categories = CATEGORY_SCHEMA if categories is None else categories
+        self._first: Dict[str, np.dtype] = {}
+        self._values: Dict[str, List[object]] = {}
+        # numeric columns: (low, high) while every chunk was integer, and float32 losslessness
+        self._int_range: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._float32: Dict[str, bool] = {}
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        for name in chunk.columns:
+            col = chunk[name]
+            self._first.setdefault(name, col.dtype)
+            first = self._first[name]
+            if isinstance(first, pd.CategoricalDtype) or name in self.categories:
+                seen = self._values.setdefault(name, [])
+                known = set(seen)
+                seen.extend(v for v in col.dropna().unique().tolist() if v not in known)
+            elif pd.api.types.is_signed_integer_dtype(first) or pd.api.types.is_float_dtype(first):
+                if not pd.api.types.is_signed_integer_dtype(col.dtype):
+                    self._int_range[name] = None
+                elif len(col) and self._int_range.get(name, ()) is not None:
+                    low, high = int(col.min()), int(col.max())
+                    if name in self._int_range:
+                        low, high = min(low, self._int_range[name][0]), max(high, self._int_range[name][1])
+                    self._int_range[name] = (low, high)
+                self._float32[name] = self._float32.get(name, True) and (
+                    col.dtype == np.float32 or _float32_lossless(col))
+
+    def dtypes(self) -> Dict[str, object]:
+        out: Dict[str, object] = {}
+        for name, first in self._first.items():
+            if isinstance(first, pd.CategoricalDtype):
+                known = set(first.categories)
+                extra = [v for v in self._values[name] if v not in known]
+                out[name] = first if not extra else pd.CategoricalDtype(list(first.categories) + extra)
+            elif name in self.categories:
+                values = self._values[name]
+                fixed = self.categories[name]
+                if fixed is not None and set(values) <= set(fixed):
+                    out[name] = pd.CategoricalDtype(fixed)
+                else:
+                    try:
+                        values = sorted(values)
+                    except TypeError:
+                        pass
+                    out[name] = pd.CategoricalDtype(values)
+            elif name in self._float32:
+                # integer in every chunk (an all-empty column downcasts like compact_frame's: int8)
+                int_range = self._int_range.get(name, (0, 0))
+                if int_range is not None:
+                    out[name] = _integer_dtype(*int_range)
+                else:
+                    out[name] = np.dtype(np.float32 if self._float32[name] else np.float64)
+            else:
+                out[name] = first
+        return out
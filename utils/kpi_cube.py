@@ -0,0 +1,97 @@
+"""
+KPI Cube - pre-aggregated counts for the Institutional Dashboard
+
+The dataset is grouped once into cells keyed by program x risk level x
+graduation year, each holding additive measures (student, pass/fail and
+at-risk counts, GPA sum and count). Every combination of the dashboard's
+filters is answered by selecting and summing a handful of cells.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .risk_engine import INSTITUTIONAL_GPA_CUTOFFS, RISK_LEVEL_DTYPE, gpa_risk_levels, risk_level_code
+
+
+DIMENSIONS = ['program', 'risk_level', 'graduation_year']
+MEASURES = ['students', 'passed', 'failed', 'gpa_count', 'gpa_sum', 'at_risk', 'low_credits']
+
+AT_RISK_GPA = 2.5
+LOW_CREDITS = 30
+
+
+class KpiCube(NamedTuple):
+    cells: pd.DataFrame
+    programs: List[str]
+    has_risk_level: bool
+    year_range: Optional[Tuple[int, int]]
+
+
+def build_kpi_cube(df: pd.DataFrame) -> KpiCube:
+    """Aggregate df into KPI cells; the only full scan of the data the dashboard needs.
+
+    Uses df's precomputed institutional_risk_level when present (enriched frame).
+    """
+    n = len(df)
+    has_gpa = 'prior_gpa' in df.columns
+    gpa = (pd.to_numeric(df['prior_gpa'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+           if has_gpa else np.full(n, np.nan))
+    performance = df['student_performance'] if 'student_performance' in df.columns else pd.Series([None] * n, index=df.index)
+    credits = (pd.to_numeric(df['credits'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+               if 'credits' in df.columns else np.full(n, np.nan))
+    has_year = 'graduation_year' in df.columns
+
+    frame = pd.DataFrame({
+        'program': df['program'] if 'program' in df.columns else pd.Series([None] * n, index=df.index, dtype=object),
+        'risk_level': (pd.Categorical(df['institutional_risk_level'], dtype=RISK_LEVEL_DTYPE)
+                       if 'institutional_risk_level' in df.columns
+                       else gpa_risk_levels(gpa, INSTITUTIONAL_GPA_CUTOFFS)),
+        'graduation_year': pd.to_numeric(df['graduation_year'], errors='coerce') if has_year else np.full(n, np.nan),
+        'students': np.ones(n, dtype=np.int64),
+        'passed': (performance == 'Pass').to_numpy(dtype=np.int64),
+        'failed': (performance == 'Fail').to_numpy(dtype=np.int64),
+        'gpa_count': (~np.isnan(gpa)).astype(np.int64),
+        'gpa_sum': np.nan_to_num(gpa),
+        'at_risk': (gpa < AT_RISK_GPA).astype(np.int64),
+        'low_credits': (credits < LOW_CREDITS).astype(np.int64),
+    })
+    cells = frame.groupby(DIMENSIONS, dropna=False, observed=True, sort=True).sum().reset_index()
+
+    years = cells['graduation_year'].dropna()
+    year_range = (int(years.min()), int(years.max())) if has_year and len(years) else None
+    programs = sorted(cells['program'].dropna().unique().tolist())
+    return KpiCube(cells, programs, has_gpa, year_range)
+
+
+def select_cells(cube: KpiCube, program: Optional[str] = None, risk_level: Optional[str] = None,
+                 years: Optional[Tuple[int, int]] = None) -> pd.DataFrame:
+    """Cells matching the filters (None = no filter on that dimension)."""
+    cells = cube.cells
+    mask = np.ones(len(cells), dtype=bool)
+    if program is not None:
+        mask &= (cells['program'] == program).to_numpy()
+    if risk_level is not None and cube.has_risk_level:
+        mask &= cells['risk_level'].cat.codes.to_numpy() == risk_level_code(risk_level)
+    if years is not None and cube.year_range is not None:
+        # missing graduation years never fall inside a range
+        mask &= cells['graduation_year'].between(years[0], years[1]).to_numpy()
+    return cells[mask]
+
+
+def summarize_kpis(cells: pd.DataFrame) -> Dict:
+    """Same keys as institutional_dashboard.compute_kpis."""
+    gpa_count = int(cells['gpa_count'].sum())
+    return {
+        'total': int(cells['students'].sum()),
+        'at_risk': int(cells['at_risk'].sum()),
+        'prior_gpa': float(cells['gpa_sum'].sum() / gpa_count) if gpa_count else None,
+        'financial_risk': int(cells['low_credits'].sum()),
+    }
+
+
+def by_program(cells: pd.DataFrame) -> pd.DataFrame:
+    """Measures summed per program (programs with students only)."""
+    grouped = cells.groupby('program', sort=True)[MEASURES].sum()
+    return grouped[grouped['students'] > 0]
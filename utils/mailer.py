@@ -0,0 +1,269 @@
+"""
+Mailer - background SMTP delivery with pooled connections
+
+Messages are queued and returned to the caller immediately as job ids. A
+small pool of worker threads, each holding one persistent (logged-in) SMTP
+connection, sends them in batches. Transient failures are retried with
+exponential backoff; permanent (5xx) rejections fail the job. Pages poll
+job status instead of waiting on the server.
+
+Works against any SMTP server: implicit TLS (SMTP_SSL, the default),
+STARTTLS, or plain SMTP for local stand-ins such as aiosmtpd.
+"""
+
+import heapq
+import itertools
+import smtplib
+import ssl
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+SECURITY_MODES = ('ssl', 'starttls', 'none')
+
+QUEUED, SENDING, SENT, FAILED = 'queued', 'sending', 'sent', 'failed'
+
+# Finished jobs kept around for status queries
+_MAX_FINISHED_JOBS = 10000
+
+
+class SmtpSettings(NamedTuple):
+    host: str
+    port: int
+    sender: str
+    user: str = ''
+    password: str = ''
+    security: str = 'ssl'
+    timeout: float = 30.0
+
+
+@dataclass
+class MailJob:
+    id: int
+    to: str
+    subject: str
+    body: str
+    status: str = QUEUED
+    attempts: int = 0
+    error: str = ''
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+
+
+def _is_permanent(exc: Exception) -> bool:
+    code = getattr(exc, 'smtp_code', None)
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [c for c, _ in exc.recipients.values()]
+        return bool(codes) and all(500 <= c < 600 for c in codes)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+def _open_connection(settings: SmtpSettings) -> smtplib.SMTP:
+    if settings.security not in SECURITY_MODES:
+        raise ValueError(f"Unknown SMTP security mode: {settings.security}")
+    if settings.security == 'ssl':
+        conn = smtplib.SMTP_SSL(settings.host, settings.port, timeout=settings.timeout,
+                                context=ssl.create_default_context())
+    else:
+        conn = smtplib.SMTP(settings.host, settings.port, timeout=settings.timeout)
+        if settings.security == 'starttls':
+            conn.starttls(context=ssl.create_default_context())
+    conn.ehlo_or_helo_if_needed()
+    if settings.user:
+        conn.login(settings.user, settings.password)
+    return conn
+
+
+def _close_connection(conn: Optional[smtplib.SMTP]) -> None:
+    if conn is None:
+        return
+    try:
+        conn.quit()
+    except Exception:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class MailQueue:
+    """Delivery queue for one SMTP server.
+
+    workers: number of sender threads (= pooled connections).
+    batch_size: messages a worker sends back to back on one connection.
+    max_attempts / backoff: retry budget; the n-th retry waits backoff * 2**(n-1) seconds.
+    idle_timeout: seconds before an unused connection is closed.
+    """
+
+    def __init__(self, settings: SmtpSettings, workers: int = 2, batch_size: int = 25,
+                 max_attempts: int = 4, backoff: float = 1.0, idle_timeout: float = 30.0):
+        self.settings = settings
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.idle_timeout = idle_timeout
+        self._jobs: Dict[int, MailJob] = {}
+        self._finished: 'OrderedDict[int, None]' = OrderedDict()
+        self._ready: List[Tuple[float, int]] = []  # heap of (not_before, job_id)
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"mailer-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # -- public API -------------------------------------------------------
+
+    def submit(self, to: str, subject: str, body: str) -> int:
+        """Queue one message; returns its job id."""
+        return self.submit_many([(to, subject, body)])[0]
+
+    def submit_many(self, messages: Iterable[Tuple[str, str, str]]) -> List[int]:
+        """Queue (to, subject, body) messages in one step; returns their job ids."""
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MailQueue is closed")
+            ids = []
+            for to, subject, body in messages:
+                job = MailJob(next(self._ids), to, subject, body, created_at=time.time())
+                self._jobs[job.id] = job
+                heapq.heappush(self._ready, (now, job.id))
+                ids.append(job.id)
+            self._cond.notify_all()
+        return ids
+
+    def status(self, job_id: int) -> Optional[MailJob]:
+        """Snapshot of a job, or None if unknown (or pruned long after finishing)."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return MailJob(**vars(job)) if job else None
+
+    def summary(self, job_ids: Iterable[int]) -> Dict[str, int]:
+        """Count of the given jobs per status."""
+        with self._cond:
+            return dict(Counter(self._jobs[i].status for i in job_ids if i in self._jobs))
+
+    def wait(self, job_ids: Iterable[int], timeout: Optional[float] = None) -> bool:
+        """Block until every job has finished (sent or failed); False on timeout."""
+        ids = list(job_ids)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if all(self._jobs.get(i) is None or self._jobs[i].status in (SENT, FAILED) for i in ids):
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting jobs, drain the queue and close the connections."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # -- worker -----------------------------------------------------------
+
+    def _next_batch(self) -> Optional[List[MailJob]]:
+        """Jobs that are due, [] after idle_timeout with nothing to do, None on shutdown."""
+        with self._cond:
+            idle_until = time.monotonic() + self.idle_timeout
+            while True:
+                now = time.monotonic()
+                if self._ready and self._ready[0][0] <= now:
+                    batch = []
+                    while self._ready and self._ready[0][0] <= now and len(batch) < self.batch_size:
+                        job = self._jobs[heapq.heappop(self._ready)[1]]
+                        job.status = SENDING
+                        batch.append(job)
+                    return batch
+                if self._closed and not self._ready:
+                    return None
+                if now >= idle_until and not self._ready:
+                    return []
+                wake_at = self._ready[0][0] if self._ready else idle_until
+                self._cond.wait(max(0.0, wake_at - now))
+
+    def _finish(self, job: MailJob, status: str, error: str = '') -> None:
+        with self._cond:
+            job.status, job.error, job.finished_at = status, error, time.time()
+            self._finished[job.id] = None
+            while len(self._finished) > _MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.popitem(last=False)[0], None)
+            self._cond.notify_all()
+
+    def _retry(self, job: MailJob, error: str) -> None:
+        if job.attempts >= self.max_attempts:
+            self._finish(job, FAILED, error)
+            return
+        with self._cond:
+            job.status, job.error = QUEUED, error
+            delay = self.backoff * 2 ** (job.attempts - 1)
+            heapq.heappush(self._ready, (time.monotonic() + delay, job.id))
+            self._cond.notify_all()
+
+    def _message(self, job: MailJob) -> EmailMessage:
+        msg = EmailMessage()
+        msg['Subject'] = job.subject
+        msg['From'] = self.settings.sender
+        msg['To'] = job.to
+        msg.set_content(job.body)
+        return msg
+
+    def _run(self) -> None:
+        conn: Optional[smtplib.SMTP] = None
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                # idle or shutting down: release the connection
+                _close_connection(conn)
+                conn = None
+                if batch is None:
+                    return
+                continue
+            for job in batch:
+                job.attempts += 1
+                try:
+                    if conn is None:
+                        conn = _open_connection(self.settings)
+                    try:
+                        conn.send_message(self._message(job))
+                    except smtplib.SMTPServerDisconnected:
+                        # pooled connection went stale between batches: reconnect once
+                        _close_connection(conn)
+                        conn = _open_connection(self.settings)
+                        conn.send_message(self._message(job))
+                except Exception as exc:
+                    # a rejected message leaves the session usable; anything else drops it
+                    rejected = isinstance(exc, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+                    if not rejected or isinstance(exc, smtplib.SMTPAuthenticationError):
+                        _close_connection(conn)
+                        conn = None
+                    if _is_permanent(exc):
+                        self._finish(job, FAILED, f'Email error: {exc}')
+                    else:
+                        self._retry(job, f'Email error: {exc}')
+                else:
+                    self._finish(job, SENT)
+
+
+_queues: Dict[SmtpSettings, MailQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_mail_queue(settings: SmtpSettings) -> MailQueue:
+    """Process-wide queue for settings (one worker pool per SMTP server/account)."""
+    with _queues_lock:
+        mail_queue = _queues.get(settings)
+        if mail_queue is None:
+            mail_queue = _queues[settings] = MailQueue(settings)
+        return mail_queue
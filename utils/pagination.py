@@ -0,0 +1,63 @@
+"""
+Pagination - filter, sort and slice a frame without copying it
+
+Filters are boolean masks over row positions and sorting only looks at the
+sort columns of the matching rows. The frame itself is indexed once, for the
+rows of the requested page, so a rerun costs the same whether the cohort has
+three thousand students or three hundred thousand.
+"""
+
+import math
+from typing import List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class Page(NamedTuple):
+    rows: pd.DataFrame
+    number: int
+    total_pages: int
+    total_rows: int
+    offset: int
+
+
+def page_count(total_rows: int, page_size: int) -> int:
+    """Number of pages for total_rows (at least one, so an empty result still has page 1)."""
+    return max(1, math.ceil(total_rows / page_size))
+
+
+def clamp_page(page: int, total_rows: int, page_size: int) -> int:
+    return min(max(1, int(page)), page_count(total_rows, page_size))
+
+
+def paginate(
+    df: pd.DataFrame,
+    page: int,
+    page_size: int,
+    mask: Optional[np.ndarray] = None,
+    sort_by: Union[str, List[str], None] = None,
+    ascending: Union[bool, Sequence[bool]] = True,
+) -> Page:
+    """Return one page of df[mask] sorted by sort_by (stable, ties keep frame order).
+
+    page is 1-based and clamped to the available range.
+    """
+    positions = np.flatnonzero(mask) if mask is not None else np.arange(len(df))
+    if sort_by is not None and len(positions):
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        if isinstance(keys, pd.Series):
+            order = keys.sort_values(ascending=ascending, kind='stable').index.to_numpy()
+        else:
+            order = keys.sort_values(by=list(keys.columns), ascending=ascending, kind='stable').index.to_numpy()
+        positions = positions[order]
+
+    number = clamp_page(page, len(positions), page_size)
+    offset = (number - 1) * page_size
+    return Page(
+        rows=df.iloc[positions[offset:offset + page_size]],
+        number=number,
+        total_pages=page_count(len(positions), page_size),
+        total_rows=len(positions),
+        offset=offset,
+    )
@@ -0,0 +1,32 @@
+"""
+Ranking - top-K selection without sorting whole columns
+
+np.partition finds the K-th best value in O(n); only the K rows at or above it
+are sorted. Ties are broken by row position, so results match a stable
+descending sort.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def top_k(values: np.ndarray, k: int, mask: Optional[np.ndarray] = None, largest: bool = True) -> np.ndarray:
+    """Positions of the k largest (or smallest) values, best first; ties keep position order.
+
+    mask limits the candidates; NaN values are never selected.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    candidates = np.flatnonzero(~np.isnan(values) if mask is None else (mask & ~np.isnan(values)))
+    keys = -values[candidates] if largest else values[candidates]
+    k = max(0, min(int(k), len(candidates)))
+    if k == 0:
+        return candidates[:0]
+    if k < len(candidates):
+        # everything strictly better than the k-th key, then equal keys in position order
+        kth = np.partition(keys, k - 1)[k - 1]
+        better = keys < kth
+        tied = np.flatnonzero(keys == kth)[:k - np.count_nonzero(better)]
+        chosen = np.sort(np.concatenate((np.flatnonzero(better), tied)))
+        candidates, keys = candidates[chosen], keys[chosen]
+    return candidates[np.argsort(keys, kind='stable')]
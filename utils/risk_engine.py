@@ -0,0 +1,229 @@
+"""
+Columnar Risk Engine - vectorized synthetic profiles, weighted risk and flags
+
+Mirrors the per-row helpers the advisor page used to apply with iterrows()
+(synthesize_student_profile, compute_weighted_risk, compute_indicator_flags,
+kept as the reference implementation in tests/test_risk_engine.py) but
+evaluates every student at once with NumPy/pandas column operations.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Bump whenever scoring output changes so derived caches are rebuilt
+ENGINE_VERSION = 4
+
+AID_OPTIONS = ['On time', 'Delayed', 'Payment Plan']
+
+RISK_LEVELS = ['High', 'Medium', 'Low']
+RISK_LEVEL_DTYPE = pd.CategoricalDtype(RISK_LEVELS, ordered=True)
+
+# (High below, Medium below) GPA cutoffs of each page's GPA-based risk level
+INSTITUTIONAL_GPA_CUTOFFS = (2.5, 3.4)
+STUDENT_GPA_CUTOFFS = (2.0, 3.0)
+
+PROFILE_COLUMNS = [
+    'attendance_pct',
+    'unpaid_fees',
+    'counseling_visits',
+    'warnings_count',
+    'financial_aid_status',
+    'engagement_score',
+    'gpa_drop',
+    'housing',
+    'study_hours',
+    'credits',
+]
+
+FLAG_NAMES = (
+    'academic_high_risk',
+    'attendance_alert',
+    'financial_risk',
+    'dropout_risk',
+    'low_engagement',
+    'high_attrition_warnings',
+    'stop_out_risk',
+    'integration_risk',
+    'study_hours_risk',
+    'gpa_drop_warning',
+)
+
+
+def seed_from_ids(ids: pd.Series) -> np.ndarray:
+    """Vectorized _seed_from_id: sum of code points of str(student_id)."""
+    codes = np.asarray(ids.to_numpy(dtype=object)).astype(np.str_)
+    if codes.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    width = codes.dtype.itemsize // 4
+    return codes.view(np.uint32).reshape(len(codes), width).sum(axis=1, dtype=np.int64)
+
+
+def _column(df: pd.DataFrame, column: str, default) -> pd.Series:
+    if column in df.columns:
+        return df[column]
+    return pd.Series([default] * len(df), index=df.index)
+
+
+def _gpa_values(df: pd.DataFrame) -> np.ndarray:
+    """GPA as float64 with None/missing mapped to NaN."""
+    if 'gpa' not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df['gpa'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def gpa_risk_levels(gpa, cutoffs: tuple[float, float]) -> pd.Categorical:
+    """GPA binned into the RISK_LEVEL_DTYPE categories with pd.cut; missing GPA is Medium."""
+    gpa = pd.to_numeric(pd.Series(gpa), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    high, medium = cutoffs
+    levels = pd.cut(gpa, [-np.inf, high, medium, np.inf], right=False, labels=RISK_LEVELS)
+    # +inf falls outside the last half-open bin; it is Low like any GPA above the cutoffs
+    codes = np.where(gpa == np.inf, RISK_LEVELS.index('Low'), levels.codes)
+    codes = np.where(codes < 0, RISK_LEVELS.index('Medium'), codes)
+    return pd.Categorical.from_codes(codes, dtype=RISK_LEVEL_DTYPE)
+
+
+def risk_level_code(level: str) -> int:
+    """Integer category code of a risk level, for comparing against .cat.codes."""
+    return RISK_LEVELS.index(level)
+
+
+def synthesize_profiles(df: pd.DataFrame) -> pd.DataFrame:
+    """Columnar synthesize_student_profile for every row of df."""
+    seed = seed_from_ids(_column(df, 'student_id', ''))
+    gpa = _gpa_values(df)
+    has_gpa = ~np.isnan(gpa)
+
+    gpa_shift = np.where(has_gpa, gpa - 2.5, 0.0)
+    base_att = 75 + np.where(has_gpa, np.trunc(gpa_shift * 8), 0).astype(np.int64)
+    attendance = np.clip(base_att + (seed % 11) - 5, 30, 100)
+
+    unpaid_fees = (seed % 6) * 300
+    counseling = seed % 5
+    warnings = (seed % 4) + (gpa < 2.5).astype(np.int64)
+    financial_aid = np.asarray(AID_OPTIONS)[seed % len(AID_OPTIONS)]
+
+    base_eng = 60 + np.where(has_gpa, np.trunc(gpa_shift * 12), 0).astype(np.int64)
+    engagement = np.clip(base_eng + (seed % 21) - 10, 0, 100)
+
+    gpa_drop = (seed % 9) / 10.0
+    housing = np.where(seed % 2 == 0, 'Commuter', 'On-campus')
+
+    # `gpa or 2.5` in the scalar version: missing or zero GPA falls back to 2.5
+    study_gpa = np.where(has_gpa & (gpa != 0), gpa, 2.5)
+    study_hours = np.clip(15 + np.trunc(study_gpa * 6).astype(np.int64) + (seed % 21) - 10, 0, 80)
+
+    credits = _column(df, 'credits', 0)
+
+    return pd.DataFrame({
+        'attendance_pct': attendance,
+        'unpaid_fees': unpaid_fees,
+        'counseling_visits': counseling,
+        'warnings_count': warnings,
+        'financial_aid_status': financial_aid,
+        'engagement_score': engagement,
+        'gpa_drop': gpa_drop,
+        'housing': housing,
+        'study_hours': study_hours,
+        'credits': credits.to_numpy(),
+    }, index=df.index)
+
+
+def compute_indicator_flag_frame(profiles: pd.DataFrame, gpa: np.ndarray) -> pd.DataFrame:
+    """Columnar compute_indicator_flags; one boolean column per FLAG_NAMES entry."""
+    credits = pd.to_numeric(profiles['credits'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    flags = {
+        'academic_high_risk': gpa < 2.0,
+        'attendance_alert': profiles['attendance_pct'].to_numpy() < 80,
+        'financial_risk': profiles['unpaid_fees'].to_numpy() > 500,
+        'dropout_risk': credits < 30,
+        'low_engagement': (profiles['counseling_visits'].to_numpy() == 0) | (profiles['engagement_score'].to_numpy() < 50),
+        'high_attrition_warnings': profiles['warnings_count'].to_numpy() >= 2,
+        'stop_out_risk': profiles['financial_aid_status'].to_numpy() == 'Delayed',
+        'integration_risk': profiles['housing'].to_numpy() == 'Commuter',
+        'study_hours_risk': profiles['study_hours'].to_numpy() < 20,
+        'gpa_drop_warning': profiles['gpa_drop'].to_numpy() > 0.5,
+    }
+    return pd.DataFrame(flags, index=profiles.index)
+
+
+def pack_flag_frame(flags: pd.DataFrame) -> np.ndarray:
+    """Pack a flag frame into one uint16 bitmask per row (bit i = FLAG_NAMES[i])."""
+    codes = np.zeros(len(flags), dtype=np.uint16)
+    for bit, name in enumerate(FLAG_NAMES):
+        codes |= flags[name].to_numpy().astype(np.uint16) << np.uint16(bit)
+    return codes
+
+
+def flag_mask(*names: str) -> int:
+    """Bitmask with the bits of the given flag names set."""
+    mask = 0
+    for name in names:
+        if name not in FLAG_NAMES:
+            raise KeyError(f"Unknown risk flag {name!r}")
+        mask |= 1 << FLAG_NAMES.index(name)
+    return mask
+
+
+def has_flags(codes, *names: str, match_all: bool = True) -> np.ndarray:
+    """Rows whose risk_flags contain all (or, with match_all=False, any) of names."""
+    codes = np.asarray(codes, dtype=np.uint16)
+    mask = np.uint16(flag_mask(*names))
+    if match_all:
+        return (codes & mask) == mask
+    return (codes & mask) != 0
+
+
+def decode_flags(code: int) -> dict:
+    """One risk_flags value as the compute_indicator_flags dict."""
+    code = int(code)
+    return {name: bool(code >> bit & 1) for bit, name in enumerate(FLAG_NAMES)}
+
+
+def flag_counts(codes) -> pd.Series:
+    """Number of rows with each flag set, indexed by FLAG_NAMES."""
+    codes = np.asarray(codes, dtype=np.uint16)
+    return pd.Series(
+        [int(np.count_nonzero(codes & np.uint16(1 << bit))) for bit in range(len(FLAG_NAMES))],
+        index=list(FLAG_NAMES),
+    )
+
+
+def compute_weighted_risk_frame(profiles: pd.DataFrame, gpa: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Columnar compute_weighted_risk; returns (risk_score, risk_label) arrays."""
+    has_gpa = ~np.isnan(gpa)
+    safe_gpa = np.where(has_gpa, gpa, 0.0)
+
+    acad = np.trunc(np.clip((3.5 - safe_gpa) / 3.5 * 100, 0, 100)).astype(np.int64)
+    acad = np.minimum(100, acad + np.trunc(profiles['gpa_drop'].to_numpy() * 40).astype(np.int64))
+    acad = np.where(profiles['study_hours'].to_numpy() < 20, np.minimum(100, acad + 10), acad)
+    acad = np.where(has_gpa, acad, 50)
+
+    fin = np.trunc(np.minimum(100, profiles['unpaid_fees'].to_numpy() / 2000 * 100)).astype(np.int64)
+    fin = np.where(profiles['financial_aid_status'].to_numpy() == 'Delayed', np.minimum(100, fin + 25), fin)
+
+    eng = np.trunc(np.clip(100 - profiles['engagement_score'].to_numpy(), 0, 100)).astype(np.int64)
+
+    total = np.rint(0.5 * acad + 0.3 * fin + 0.2 * eng).astype(np.int64)
+    label = np.where(total >= 70, 'High', np.where(total >= 40, 'Medium', 'Low'))
+    return total, label
+
+
+def score_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with synthesized attributes, risk score/label and risk flags appended."""
+    gpa = _gpa_values(df)
+    profiles = synthesize_profiles(df)
+    score, label = compute_weighted_risk_frame(profiles, gpa)
+    flags = compute_indicator_flag_frame(profiles, gpa)
+
+    profiles['risk_score'] = score
+    profiles['risk_label'] = label
+    profiles['risk_flags'] = pack_flag_frame(flags)
+    # GPA-only risk levels of the institutional dashboard (prior GPA) and the student profile (GPA)
+    prior_gpa = df['prior_gpa'] if 'prior_gpa' in df.columns else gpa
+    profiles['institutional_risk_level'] = gpa_risk_levels(prior_gpa, INSTITUTIONAL_GPA_CUTOFFS)
+    profiles['student_risk_level'] = gpa_risk_levels(gpa, STUDENT_GPA_CUTOFFS)
+    # profile 'credits' is a passthrough of df['credits']; keep a single column
+    if 'credits' in df.columns:
+        profiles = profiles.drop(columns='credits')
+    return pd.concat([df.reset_index(drop=True), profiles.reset_index(drop=True)], axis=1)
@@ -0,0 +1,141 @@
+"""
+Search Index - n-gram inverted index over student IDs and names
+
+Built once per dataset version. Queries keep the pages' case-insensitive
+substring semantics (`query in id or query in name`) but are answered from
+posting lists instead of scanning every row:
+
+* queries of 1-3 characters are a single posting-list lookup;
+* longer queries intersect the postings of their trigrams and verify the
+  (few) surviving candidates.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+MAX_GRAM = 3
+
+
+def _normalize(values: pd.Series) -> np.ndarray:
+    return np.asarray(values.fillna('').astype(str).str.strip().str.lower().to_numpy(dtype=object), dtype=np.str_)
+
+
+def _code_matrix(texts: np.ndarray) -> np.ndarray:
+    """(rows, max_len) matrix of code points, zero-padded."""
+    if texts.size == 0:
+        return np.zeros((0, 1), dtype=np.int64)
+    width = texts.dtype.itemsize // 4
+    return texts.view(np.uint32).reshape(len(texts), width).astype(np.int64)
+
+
+def _gram_keys(codes: np.ndarray, n: int, bits: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Packed n-gram keys and their (ascending) row numbers for every position of every row."""
+    rows, width = codes.shape
+    if width < n:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    keys = np.zeros((rows, width - n + 1), dtype=np.int64)
+    valid = np.ones_like(keys, dtype=bool)
+    for k in range(n):
+        part = codes[:, k:width - n + 1 + k]
+        keys = (keys << bits) | part
+        valid &= part != 0
+    row_ids = np.broadcast_to(np.arange(rows, dtype=np.int64)[:, None], keys.shape)
+    return keys[valid], row_ids[valid]
+
+
+class _Postings:
+    """CSR posting lists: sorted unique keys -> sorted unique row numbers."""
+
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, key_bits: int, row_bits: int):
+        if key_bits + row_bits <= 63:
+            # (key, row) pairs fit one int64: a plain sort groups and orders them
+            packed = np.sort((keys << row_bits) | rows)
+            if len(packed):
+                packed = packed[np.append(True, packed[1:] != packed[:-1])]
+            keys, rows = packed >> row_bits, packed & ((1 << row_bits) - 1)
+        else:
+            order = np.lexsort((rows, keys))
+            keys, rows = keys[order], rows[order]
+            if len(keys):
+                keep = np.append(True, (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1]))
+                keys, rows = keys[keep], rows[keep]
+        self.keys, self.starts = np.unique(keys, return_index=True)
+        self.ends = np.append(self.starts[1:], len(keys)).astype(np.int64)
+        self.rows = rows.astype(np.int32)
+
+    def get(self, key: Optional[int]) -> np.ndarray:
+        i = np.searchsorted(self.keys, key) if key is not None else len(self.keys)
+        if i >= len(self.keys) or self.keys[i] != key:
+            return self.rows[:0]
+        return self.rows[self.starts[i]:self.ends[i]]
+
+
+class SearchIndex:
+    """Case-insensitive substring search over one or more text columns."""
+
+    def __init__(self, columns: List[pd.Series]):
+        self._texts = [_normalize(col) for col in columns]
+        self._size = len(columns[0]) if columns else 0
+        # one matrix for all columns; the zero separator keeps n-grams from spanning two of them
+        matrices = [_code_matrix(texts) for texts in self._texts]
+        separators = [np.zeros((self._size, 1), dtype=np.int64)] * len(matrices)
+        codes = np.hstack([m for pair in zip(matrices, separators) for m in pair]) if matrices else np.zeros((0, 1), dtype=np.int64)
+
+        # re-code characters densely (1..len(alphabet)) so keys stay small
+        alphabet = np.unique(codes[codes != 0])
+        self._char_codes = {chr(c): i + 1 for i, c in enumerate(alphabet.tolist())}
+        self._bits = max(1, len(alphabet).bit_length())
+        codes = np.where(codes != 0, np.searchsorted(alphabet, codes) + 1, 0)
+        row_bits = max(1, (self._size - 1).bit_length())
+
+        self._postings: Dict[int, _Postings] = {}
+        for n in range(1, MAX_GRAM + 1):
+            keys, rows = _gram_keys(codes, n, self._bits)
+            self._postings[n] = _Postings(keys, rows, n * self._bits, row_bits)
+
+    def _pack(self, text: str) -> Optional[int]:
+        key = 0
+        for ch in text:
+            code = self._char_codes.get(ch)
+            if code is None:
+                return None
+            key = (key << self._bits) | code
+        return key
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Tuple[str, ...] = ('student_id', 'name')) -> 'SearchIndex':
+        """Index the given columns of df (missing columns are skipped)."""
+        return cls([df[c] for c in columns if c in df.columns])
+
+    def __len__(self) -> int:
+        return self._size
+
+    def search(self, query: Optional[str]) -> np.ndarray:
+        """Sorted row positions whose text contains query; every row for an empty query."""
+        q = (query or '').strip().lower()
+        if not q:
+            return np.arange(self._size)
+        if len(q) <= MAX_GRAM:
+            return self._postings[len(q)].get(self._pack(q)).astype(np.int64)
+
+        trigrams = {q[i:i + MAX_GRAM] for i in range(len(q) - MAX_GRAM + 1)}
+        lists = sorted((self._postings[MAX_GRAM].get(self._pack(g)) for g in trigrams), key=len)
+        candidates = lists[0]
+        for other in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates, other, assume_unique=True)
+        candidates = candidates.astype(np.int64)
+        hit = np.zeros(len(candidates), dtype=bool)
+        for texts in self._texts:
+            hit |= np.char.find(texts[candidates], q) >= 0
+        return candidates[hit]
+
+    def mask(self, query: Optional[str]) -> np.ndarray:
+        """Boolean row mask for query."""
+        out = np.zeros(self._size, dtype=bool)
+        out[self.search(query)] = True
+        return out